@@ -1,5 +1,9 @@
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -9,6 +13,8 @@ import os
 from dotenv import load_dotenv
 from pydantic import BaseModel
 
+from app.utils.cache import LRUCache
+
 # Load environment variables
 load_dotenv()
 
@@ -16,9 +22,29 @@ load_dotenv()
 SECRET_KEY = os.getenv("JWT_SECRET")
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10000))
+
+# Password hashing configuration
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 4))
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", 64))
+
+# Password hashing context. Pinning min/max rounds to the configured cost makes
+# any hash created with a different cost factor report that it needs an update.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS
+)
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Bounded worker pool so bcrypt never runs on the event loop
+_password_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+_pending_password_jobs = 0
 
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
@@ -29,6 +55,10 @@ class TokenData(BaseModel):
     user_id: Optional[str] = None
     role: Optional[str] = None
 
+# Verified token claims keyed by token digest, valid until the token's exp
+_token_cache = LRUCache(max_size=TOKEN_CACHE_SIZE)
+_token_cache_key_fingerprint = None
+
 def verify_password(plain_password, hashed_password):
     """
     Verify a password against a hash
@@ -41,6 +71,44 @@ def get_password_hash(password):
     """
     return pwd_context.hash(password)
 
+async def _run_password_job(func, *args):
+    """
+    Run a password hashing function on the worker pool, shedding load when the queue is full
+    """
+    global _pending_password_jobs
+    
+    if _pending_password_jobs >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_LIMIT:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication service is busy, please retry",
+            headers={"Retry-After": "1"},
+        )
+    
+    _pending_password_jobs += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_password_executor, func, *args)
+    finally:
+        _pending_password_jobs -= 1
+
+async def verify_password_async(plain_password, hashed_password) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password off the event loop, returning a replacement hash when the stored one is outdated
+    """
+    return await _run_password_job(pwd_context.verify_and_update, plain_password, hashed_password)
+
+async def get_password_hash_async(password) -> str:
+    """
+    Hash a password for storing off the event loop
+    """
+    return await _run_password_job(pwd_context.hash, password)
+
+def shutdown_password_executor():
+    """
+    Stop the password hashing worker pool
+    """
+    _password_executor.shutdown(wait=False, cancel_futures=True)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """
     Create a new JWT token
@@ -57,10 +125,41 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     
     return encoded_jwt
 
+def _signing_key_fingerprint() -> str:
+    """
+    Fingerprint of the active signing configuration
+    """
+    return hashlib.sha256(f"{ALGORITHM}:{SECRET_KEY}".encode()).hexdigest()
+
+def clear_token_cache():
+    """
+    Drop all cached token claims, e.g. after rotating the JWT secret
+    """
+    _token_cache.clear()
+
+def token_cache_stats() -> dict:
+    """
+    Return hit/miss counters for the token claims cache
+    """
+    return _token_cache.stats()
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     """
     Get the current user from the JWT token
     """
+    global _token_cache_key_fingerprint
+    
+    # Claims verified under a previous secret must never be served
+    fingerprint = _signing_key_fingerprint()
+    if fingerprint != _token_cache_key_fingerprint:
+        _token_cache.clear()
+        _token_cache_key_fingerprint = fingerprint
+    
+    token_digest = hashlib.sha256(token.encode()).digest()
+    cached = _token_cache.get(token_digest)
+    if cached is not None:
+        return cached
+    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -80,5 +179,12 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         
     except JWTError:
         raise credentials_exception
-        
+    
+    # Cache until the token expires; tokens without exp are not cached
+    expires_at = payload.get("exp")
+    if isinstance(expires_at, (int, float)):
+        ttl = expires_at - time.time()
+        if ttl > 0:
+            _token_cache.set(token_digest, token_data, ttl=ttl)
+    
     return token_data
\ No newline at end of file
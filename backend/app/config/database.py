@@ -1,6 +1,11 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
+from pymongo import monitoring
+import asyncio
 import os
+import threading
+import time
+from typing import Any, Dict, Optional
 from dotenv import load_dotenv
 
 # Import models
@@ -8,26 +13,185 @@ from app.models.user import User
 from app.models.institution import Institution
 from app.models.student import Student
 from app.models.score import Score
+from app.models.score_summary import StudentScoreSummary
+from app.models.ai_cache import AIResponseCache
+from app.models.feedback_batch import FeedbackBatch
+from app.models.job import Job
+from app.utils.indexes import verify_indexes
 
 # Load environment variables
 load_dotenv()
 
+# Connection pool settings
+MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
+MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", 100))
+MONGODB_MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", 0))
+MONGODB_MAX_IDLE_TIME_MS = int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", 0))
+MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", 30000))
+MONGODB_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS", 0))
+# Comma separated, e.g. zstd,snappy,zlib; zstd and snappy need their python packages
+MONGODB_COMPRESSORS = os.getenv("MONGODB_COMPRESSORS", "")
+MONGODB_READ_PREFERENCE = os.getenv("MONGODB_READ_PREFERENCE", "primary")
+
+# Collections managed by Beanie
+DOCUMENT_MODELS = [
+    User,
+    Institution,
+    Student,
+    Score,
+    StudentScoreSummary,
+    AIResponseCache,
+    FeedbackBatch,
+    Job
+]
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Connection pool counters, including how long operations wait to check out a connection
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Check-out start and end are reported on the same thread
+        self._started = threading.local()
+        self.connections_open = 0
+        self.connections_in_use = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+    
+    def _record_wait(self) -> float:
+        started = getattr(self._started, "at", None)
+        self._started.at = None
+        return time.perf_counter() - started if started is not None else 0.0
+    
+    def connection_check_out_started(self, event):
+        self._started.at = time.perf_counter()
+    
+    def connection_checked_out(self, event):
+        wait = self._record_wait()
+        with self._lock:
+            self.checkouts += 1
+            self.connections_in_use += 1
+            self.checkout_wait_total += wait
+            self.checkout_wait_max = max(self.checkout_wait_max, wait)
+    
+    def connection_check_out_failed(self, event):
+        self._record_wait()
+        with self._lock:
+            self.checkout_failures += 1
+    
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.connections_in_use -= 1
+    
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_open += 1
+    
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_open -= 1
+    
+    def pool_created(self, event):
+        pass
+    
+    def pool_ready(self, event):
+        pass
+    
+    def pool_cleared(self, event):
+        pass
+    
+    def pool_closed(self, event):
+        pass
+    
+    def connection_ready(self, event):
+        pass
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_pool_size": MONGODB_MAX_POOL_SIZE,
+                "min_pool_size": MONGODB_MIN_POOL_SIZE,
+                "connections_open": self.connections_open,
+                "connections_in_use": self.connections_in_use,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "checkout_wait_avg_ms": 1000 * self.checkout_wait_total / self.checkouts if self.checkouts else 0.0,
+                "checkout_wait_max_ms": 1000 * self.checkout_wait_max
+            }
+
+pool_metrics = PoolMetrics()
+
+_client: Optional[AsyncIOMotorClient] = None
+
+def create_client() -> AsyncIOMotorClient:
+    """
+    Create a MongoDB client with the configured pool settings
+    """
+    options: Dict[str, Any] = {
+        "maxPoolSize": MONGODB_MAX_POOL_SIZE,
+        "minPoolSize": MONGODB_MIN_POOL_SIZE,
+        "serverSelectionTimeoutMS": MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        "readPreference": MONGODB_READ_PREFERENCE,
+        "event_listeners": [pool_metrics],
+    }
+    if MONGODB_MAX_IDLE_TIME_MS:
+        options["maxIdleTimeMS"] = MONGODB_MAX_IDLE_TIME_MS
+    if MONGODB_WAIT_QUEUE_TIMEOUT_MS:
+        options["waitQueueTimeoutMS"] = MONGODB_WAIT_QUEUE_TIMEOUT_MS
+    if MONGODB_COMPRESSORS:
+        options["compressors"] = MONGODB_COMPRESSORS
+    
+    return AsyncIOMotorClient(MONGODB_URL, **options)
+
+def get_client() -> AsyncIOMotorClient:
+    """
+    Get the client opened by init_db
+    """
+    if _client is None:
+        raise RuntimeError("Database is not initialized")
+    return _client
+
 async def init_db():
     """
     Initialize database connection
     """
+    global _client
+    
     # MongoDB connection
-    client = AsyncIOMotorClient(os.getenv("MONGODB_URL", "mongodb://localhost:27017"))
+    _client = create_client()
+    
+    # Open the minimum pool up front instead of on the first requests
+    await asyncio.gather(*(
+        _client.admin.command("ping") for _ in range(max(MONGODB_MIN_POOL_SIZE, 1))
+    ))
     
     # Initialize Beanie with the document models
     await init_beanie(
-        database=client.techvantage,
-        document_models=[
-            User,
-            Institution,
-            Student,
-            Score
-        ]
+        database=_client.techvantage,
+        document_models=DOCUMENT_MODELS
     )
+    # Beanie creates declared indexes but leaves stale ones in place
+    await verify_indexes(DOCUMENT_MODELS)
     
-    return client
\ No newline at end of file
+    return _client
+
+def close_db():
+    """
+    Close the database client and its connection pool
+    """
+    global _client
+    
+    if _client is not None:
+        _client.close()
+        _client = None
+
+async def ping_db() -> float:
+    """
+    Round trip time of a ping to the database in milliseconds
+    """
+    started = time.perf_counter()
+    await get_client().admin.command("ping")
+    return 1000 * (time.perf_counter() - started)
@@ -1,36 +1,28 @@
 from fastapi import HTTPException, status, Depends
 from datetime import timedelta
 
-from app.models.user import User, UserCreate, UserResponse
+from pymongo.errors import DuplicateKeyError
+
+from app.models.user import User, UserCreate, UserResponse, user_mapper
+from app.utils.duplicates import duplicate_error
 from app.config.auth import (
-    verify_password,
-    get_password_hash,
+    verify_password_async,
+    get_password_hash_async,
     create_access_token,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
 
+USER_DUPLICATE_MESSAGES = {
+    "email": "Email already registered",
+    "username": "Username already taken",
+}
+
 async def register_user(user_data: UserCreate) -> UserResponse:
     """
     Register a new user
     """
-    # Check if user with email already exists
-    existing_user = await User.find_one({"email": user_data.email})
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-    
-    # Check if username is taken
-    existing_username = await User.find_one({"username": user_data.username})
-    if existing_username:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already taken"
-        )
-    
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     
     new_user = User(
         email=user_data.email,
@@ -42,20 +34,13 @@ async def register_user(user_data: UserCreate) -> UserResponse:
         institution_id=user_data.institution_id
     )
     
-    await new_user.insert()
+    # Unique indexes on email and username reject duplicates in the same round trip
+    try:
+        await new_user.insert()
+    except DuplicateKeyError as e:
+        raise duplicate_error(e, USER_DUPLICATE_MESSAGES)
     
-    return UserResponse(
-        id=str(new_user.id),
-        email=new_user.email,
-        username=new_user.username,
-        first_name=new_user.first_name,
-        last_name=new_user.last_name,
-        role=new_user.role,
-        is_active=new_user.is_active,
-        created_at=new_user.created_at,
-        updated_at=new_user.updated_at,
-        institution_id=new_user.institution_id
-    )
+    return user_mapper.response(new_user)
 
 async def authenticate_user(username: str, password: str):
     """
@@ -66,9 +51,14 @@ async def authenticate_user(username: str, password: str):
     if not user:
         return False
     
-    if not verify_password(password, user.hashed_password):
+    verified, new_hash = await verify_password_async(password, user.hashed_password)
+    if not verified:
         return False
     
+    # Transparently upgrade hashes created with a different cost factor
+    if new_hash:
+        await user.set({User.hashed_password: new_hash})
+    
     return user
 
 async def login_user(username: str, password: str):
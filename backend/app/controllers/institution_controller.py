@@ -1,10 +1,33 @@
 from fastapi import HTTPException, status
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorCollection
+from pymongo.errors import DuplicateKeyError
 
-from app.models.institution import Institution, InstitutionCreate, InstitutionUpdate, InstitutionResponse
+from app.models.institution import Institution, InstitutionCreate, InstitutionUpdate, InstitutionResponse, institution_mapper
 from app.config.auth import TokenData
+from app.utils.pagination import build_page_query
+from app.utils.projection import parse_fields, parse_object_id, sparse_row
+from app.utils.duplicates import duplicate_error
+from app.utils.updates import apply_partial_update
+from app.utils.consistency import routed_collection
+from app.utils.http_cache import make_etag
+from app.services.institution_cache import institution_cache
 
-async def create_institution(institution_data: InstitutionCreate, current_user: TokenData = None) -> InstitutionResponse:
+# Fields usable as keyset pagination sort keys besides _id
+INSTITUTION_SORT_FIELDS = ("created_at",)
+
+def _institution_reads(cached: bool) -> AsyncIOMotorCollection:
+    # Cached entries live until the change stream reports a write, so they are loaded
+    # from the primary; a lagging secondary would keep stale rows and ETags cached
+    if cached:
+        return Institution.get_motor_collection()
+    return routed_collection(Institution, "lists")
+
+async def create_institution(
+    institution_data: InstitutionCreate,
+    current_user: TokenData = None,
+    session: Optional[AsyncIOMotorClientSession] = None
+) -> InstitutionResponse:
     """
     Create a new institution
     """
@@ -15,75 +38,107 @@ async def create_institution(institution_data: InstitutionCreate, current_user:
             detail="Not enough permissions"
         )
     
-    # Check if institution with same name exists
-    existing_institution = await Institution.find_one({"name": institution_data.name})
-    if existing_institution:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Institution with this name already exists"
-        )
-    
     # Create new institution
-    new_institution = Institution(
-        name=institution_data.name,
-        address=institution_data.address,
-        city=institution_data.city,
-        state=institution_data.state,
-        country=institution_data.country,
-        postal_code=institution_data.postal_code,
-        phone=institution_data.phone,
-        email=institution_data.email,
-        website=institution_data.website,
-        type=institution_data.type
-    )
+    new_institution = Institution(**institution_data.model_dump())
+    
+    # The unique name index rejects duplicates in the same round trip
+    try:
+        await new_institution.insert(session=session)
+    except DuplicateKeyError as e:
+        raise duplicate_error(e, {"name": "Institution with this name already exists"})
     
-    await new_institution.insert()
-    
-    return InstitutionResponse(
-        id=str(new_institution.id),
-        name=new_institution.name,
-        address=new_institution.address,
-        city=new_institution.city,
-        state=new_institution.state,
-        country=new_institution.country,
-        postal_code=new_institution.postal_code,
-        phone=new_institution.phone,
-        email=new_institution.email,
-        website=new_institution.website,
-        type=new_institution.type,
-        created_at=new_institution.created_at,
-        updated_at=new_institution.updated_at
+    # Other workers are invalidated by the change stream, this one right away
+    institution_cache.invalidate()
+    
+    return institution_mapper.response(new_institution)
+
+async def get_institutions(
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[str] = None,
+    sort_by: Optional[str] = None,
+    fields: Optional[str] = None,
+    session: Optional[AsyncIOMotorClientSession] = None,
+    use_cache: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Get all institutions with offset or cursor pagination as plain response dicts.
+    With a sparse fieldset only the requested fields are returned.
+    
+    Pages are served from the institution cache, loaded from the primary, unless
+    use_cache is False. Uncached reads use the list read preference; pass a
+    causal session to see the caller's own writes.
+    """
+    if not use_cache:
+        return await _find_institutions(skip, limit, after, sort_by, fields, session, cached=False)
+    return await institution_cache.get_or_load(
+        ("institutions", skip, limit, after, sort_by, fields),
+        lambda: _find_institutions(skip, limit, after, sort_by, fields, session, cached=True)
     )
 
-async def get_institutions(skip: int = 0, limit: int = 100) -> List[InstitutionResponse]:
+async def _find_institutions(
+    skip: int,
+    limit: int,
+    after: Optional[str],
+    sort_by: Optional[str],
+    fields: Optional[str],
+    session: Optional[AsyncIOMotorClientSession],
+    cached: bool
+) -> List[Dict[str, Any]]:
+    query, sort_key, sort = build_page_query({}, sort_by, after, INSTITUTION_SORT_FIELDS)
+    projection = parse_fields(fields, InstitutionResponse, always=(sort_key,))
+    
+    cursor = _institution_reads(cached).find(
+        query,
+        projection or institution_mapper.projection,
+        session=session
+    ).sort(sort)
+    if after is None:
+        cursor = cursor.skip(skip)
+    documents = await cursor.limit(limit).to_list(length=limit)
+    
+    if projection:
+        return [sparse_row(document, projection) for document in documents]
+    return institution_mapper.payloads(documents)
+
+async def get_institutions_etag(
+    session: Optional[AsyncIOMotorClientSession] = None,
+    use_cache: bool = True
+) -> str:
     """
-    Get all institutions with pagination
+    ETag of the institution listing from the document count and the latest updated_at.
+    
+    Inserts and updates move the latest updated_at, deletes change the count; the
+    latest updated_at is a covered query on its index, so no documents are fetched.
     """
-    institutions = await Institution.find_all().skip(skip).limit(limit).to_list()
-    
-    return [
-        InstitutionResponse(
-            id=str(institution.id),
-            name=institution.name,
-            address=institution.address,
-            city=institution.city,
-            state=institution.state,
-            country=institution.country,
-            postal_code=institution.postal_code,
-            phone=institution.phone,
-            email=institution.email,
-            website=institution.website,
-            type=institution.type,
-            created_at=institution.created_at,
-            updated_at=institution.updated_at
-        ) for institution in institutions
-    ]
+    if not use_cache:
+        return await _institutions_etag(session, cached=False)
+    return await institution_cache.get_or_load(("institutions_etag",), lambda: _institutions_etag(session, cached=True))
+
+async def _institutions_etag(session: Optional[AsyncIOMotorClientSession], cached: bool) -> str:
+    collection = _institution_reads(cached)
+    count = await collection.count_documents({}, session=session)
+    latest = await collection.find_one(
+        {},
+        {"_id": 0, "updated_at": 1},
+        sort=[("updated_at", -1)],
+        session=session
+    )
+    return make_etag(count, latest["updated_at"].isoformat() if latest else None)
 
-async def get_institution_by_id(institution_id: str) -> InstitutionResponse:
+async def get_institution_by_id(institution_id: str, use_cache: bool = True) -> InstitutionResponse:
     """
-    Get an institution by ID
+    Get an institution by ID, from the institution cache unless use_cache is False
     """
-    institution = await Institution.get(institution_id)
+    if not use_cache:
+        return await _find_institution(institution_id)
+    return await institution_cache.get_or_load(("institution", institution_id), lambda: _find_institution(institution_id))
+
+async def _find_institution(institution_id: str) -> InstitutionResponse:
+    institution = await Institution.get_motor_collection().find_one(
+        {"_id": parse_object_id(institution_id, "Institution not found")},
+        institution_mapper.projection
+    )
     
     if not institution:
         raise HTTPException(
@@ -91,23 +146,14 @@ async def get_institution_by_id(institution_id: str) -> InstitutionResponse:
             detail="Institution not found"
         )
     
-    return InstitutionResponse(
-        id=str(institution.id),
-        name=institution.name,
-        address=institution.address,
-        city=institution.city,
-        state=institution.state,
-        country=institution.country,
-        postal_code=institution.postal_code,
-        phone=institution.phone,
-        email=institution.email,
-        website=institution.website,
-        type=institution.type,
-        created_at=institution.created_at,
-        updated_at=institution.updated_at
-    )
+    return institution_mapper.response(institution)
 
-async def update_institution(institution_id: str, institution_data: InstitutionUpdate, current_user: TokenData = None) -> InstitutionResponse:
+async def update_institution(
+    institution_id: str,
+    institution_data: InstitutionUpdate,
+    current_user: TokenData = None,
+    session: Optional[AsyncIOMotorClientSession] = None
+) -> InstitutionResponse:
     """
     Update an institution
     """
@@ -118,39 +164,26 @@ async def update_institution(institution_id: str, institution_data: InstitutionU
             detail="Not enough permissions"
         )
     
-    institution = await Institution.get(institution_id)
-    
-    if not institution:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Institution not found"
+    # Only the sent fields are written, in a single round trip
+    try:
+        institution = await apply_partial_update(
+            institution_mapper,
+            parse_object_id(institution_id, "Institution not found"),
+            institution_data,
+            "Institution not found",
+            session
         )
+    except DuplicateKeyError as e:
+        raise duplicate_error(e, {"name": "Institution with this name already exists"})
     
-    # Update institution fields
-    update_data = institution_data.dict(exclude_unset=True)
-    
-    for field, value in update_data.items():
-        setattr(institution, field, value)
-    
-    await institution.save()
-    
-    return InstitutionResponse(
-        id=str(institution.id),
-        name=institution.name,
-        address=institution.address,
-        city=institution.city,
-        state=institution.state,
-        country=institution.country,
-        postal_code=institution.postal_code,
-        phone=institution.phone,
-        email=institution.email,
-        website=institution.website,
-        type=institution.type,
-        created_at=institution.created_at,
-        updated_at=institution.updated_at
-    )
+    institution_cache.invalidate()
+    return institution
 
-async def delete_institution(institution_id: str, current_user: TokenData = None) -> dict:
+async def delete_institution(
+    institution_id: str,
+    current_user: TokenData = None,
+    session: Optional[AsyncIOMotorClientSession] = None
+) -> dict:
     """
     Delete an institution
     """
@@ -161,7 +194,7 @@ async def delete_institution(institution_id: str, current_user: TokenData = None
             detail="Not enough permissions"
         )
     
-    institution = await Institution.get(institution_id)
+    institution = await Institution.get(institution_id, session=session)
     
     if not institution:
         raise HTTPException(
@@ -169,6 +202,7 @@ async def delete_institution(institution_id: str, current_user: TokenData = None
             detail="Institution not found"
         )
     
-    await institution.delete()
+    await institution.delete(session=session)
+    institution_cache.invalidate()
     
     return {"message": "Institution deleted successfully"}
\ No newline at end of file
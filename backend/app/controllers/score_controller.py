@@ -0,0 +1,432 @@
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+import os
+from beanie import PydanticObjectId
+from dotenv import load_dotenv
+from pydantic import ValidationError
+from motor.motor_asyncio import AsyncIOMotorClientSession
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, OperationFailure
+
+from app.models.score import (
+    Score,
+    ScoreCreate,
+    ScoreUpdate,
+    ScoreResponse,
+    ScoreRowError,
+    ScoreBatchResult,
+    ScoreStats,
+    ScoreStatsGroup,
+    ScoreStatsGroupBy,
+    score_mapper
+)
+from app.models.student import Student
+from app.config.auth import TokenData
+from app.services.score_summary_service import (
+    apply_scores_inserted,
+    apply_score_updated,
+    apply_score_removed
+)
+from app.utils.projection import parse_object_id
+from app.utils.export import check_export_format, date_range_filter, stream_export
+from app.models.job import Job
+from app.services.job_runner import check_job_priority, enqueue_job
+from app.utils.stats import PERCENTILES, percentile_key
+from app.utils.consistency import routed_collection
+
+# Load environment variables
+load_dotenv()
+
+# Batch ingestion limits
+SCORE_BATCH_CHUNK_SIZE = int(os.getenv("SCORE_BATCH_CHUNK_SIZE", 1000))
+SCORE_BATCH_MAX_ROWS = int(os.getenv("SCORE_BATCH_MAX_ROWS", 20000))
+
+# Servers before 7.0 do not know $percentile, and older feature compatibility versions refuse it
+_PERCENTILE_UNSUPPORTED = (15952, 224)
+
+def _institution_stages(institution_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Pipeline stages setting each score's institution_id from its student,
+    keeping only the given institution's scores when one is passed
+    """
+    # Scores only reference students; joining them per score keeps the query a
+    # fixed size however many students an institution has
+    stages = [
+        {"$set": {"student_oid": {"$convert": {"input": "$student_id", "to": "objectId", "onError": None}}}},
+        {"$lookup": {
+            "from": Student.get_settings().name,
+            "localField": "student_oid",
+            "foreignField": "_id",
+            "pipeline": [{"$project": {"institution_id": 1}}],
+            "as": "student"
+        }},
+        {"$set": {"institution_id": {"$first": "$student.institution_id"}}},
+        {"$unset": ["student", "student_oid"]}
+    ]
+    if institution_id:
+        stages.append({"$match": {"institution_id": institution_id}})
+    return stages
+
+def check_score_access(current_user: Optional[TokenData]):
+    """
+    Only admins and teachers can read or record scores
+    """
+    if current_user and current_user.role not in ["admin", "teacher"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+
+async def create_score(
+    score_data: ScoreCreate,
+    current_user: TokenData = None,
+    session: Optional[AsyncIOMotorClientSession] = None
+) -> ScoreResponse:
+    """
+    Record a single score
+    """
+    check_score_access(current_user)
+    
+    new_score = Score(**score_data.model_dump())
+    await new_score.insert(session=session)
+    await apply_scores_inserted([new_score])
+    
+    return score_mapper.response(new_score)
+
+async def create_scores_batch(
+    rows: List[Dict[str, Any]],
+    ordered: bool = True,
+    current_user: TokenData = None,
+    session: Optional[AsyncIOMotorClientSession] = None
+) -> ScoreBatchResult:
+    """
+    Validate and insert a batch of scores with one insert_many per chunk.
+    
+    In ordered mode writing stops at the first invalid or rejected row and
+    later rows are not attempted. In unordered mode every valid row is
+    written and all failures are reported.
+    """
+    check_score_access(current_user)
+    
+    if len(rows) > SCORE_BATCH_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"A batch may contain at most {SCORE_BATCH_MAX_ROWS} scores"
+        )
+    
+    # Validate every row in a single pass, keeping the original row index
+    documents = []
+    errors = []
+    for index, row in enumerate(rows):
+        try:
+            score_data = ScoreCreate.model_validate(row)
+        except ValidationError as e:
+            errors.append(ScoreRowError(
+                index=index,
+                detail="Invalid score",
+                errors=[
+                    {"loc": list(error["loc"]), "msg": error["msg"], "type": error["type"]}
+                    for error in e.errors()
+                ]
+            ))
+            if ordered:
+                break
+            continue
+        
+        documents.append((index, Score(id=PydanticObjectId(), **score_data.model_dump())))
+    
+    inserted_ids = []
+    for start in range(0, len(documents), SCORE_BATCH_CHUNK_SIZE):
+        chunk = documents[start:start + SCORE_BATCH_CHUNK_SIZE]
+        
+        try:
+            await Score.insert_many([document for _, document in chunk], ordered=ordered, session=session)
+        except BulkWriteError as e:
+            write_errors = {error["index"]: error for error in e.details.get("writeErrors", [])}
+            first_failure = min(write_errors, default=len(chunk))
+            
+            written = []
+            for position, (index, document) in enumerate(chunk):
+                if position in write_errors:
+                    errors.append(ScoreRowError(index=index, detail=write_errors[position]["errmsg"]))
+                elif not ordered or position < first_failure:
+                    written.append(document)
+            
+            await apply_scores_inserted(written)
+            inserted_ids.extend(str(document.id) for document in written)
+            
+            if ordered:
+                break
+            continue
+        
+        await apply_scores_inserted(document for _, document in chunk)
+        inserted_ids.extend(str(document.id) for _, document in chunk)
+    
+    errors.sort(key=lambda error: error.index)
+    
+    return ScoreBatchResult(
+        inserted_count=len(inserted_ids),
+        inserted_ids=inserted_ids,
+        errors=errors
+    )
+
+async def get_scores(
+    skip: int = 0,
+    limit: int = 100,
+    student_id: Optional[str] = None,
+    subject: Optional[str] = None,
+    current_user: TokenData = None
+) -> List[Dict[str, Any]]:
+    """
+    Get scores with pagination and optional filtering by student and subject as plain response dicts
+    """
+    check_score_access(current_user)
+    
+    filters = {}
+    if student_id:
+        filters["student_id"] = student_id
+    if subject:
+        filters["subject"] = subject
+    
+    cursor = Score.get_motor_collection().find(filters, score_mapper.projection).sort("date", -1)
+    documents = await cursor.skip(skip).limit(limit).to_list(length=limit)
+    return score_mapper.payloads(documents)
+
+async def export_scores(
+    export_format: str = "ndjson",
+    batch_size: int = 500,
+    institution_id: Optional[str] = None,
+    student_id: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    current_user: TokenData = None,
+    background: bool = False,
+    priority: int = 0
+) -> Union[StreamingResponse, Job]:
+    """
+    Stream scores as NDJSON or CSV straight from a database cursor,
+    or queue the export as a background job writing a file
+    """
+    check_score_access(current_user)
+    
+    check_export_format(export_format)
+    if background:
+        check_job_priority(priority, current_user)
+        return await enqueue_job(
+            "scores_export",
+            {
+                "export_format": export_format,
+                "batch_size": batch_size,
+                "institution_id": institution_id,
+                "student_id": student_id,
+                "start": start,
+                "end": end
+            },
+            created_by=current_user.user_id if current_user else None,
+            priority=priority
+        )
+    
+    cursor, columns = await scores_export_cursor(institution_id, student_id, start, end)
+    return stream_export(cursor, columns, export_format, batch_size, "scores")
+
+async def scores_export_cursor(
+    institution_id: Optional[str] = None,
+    student_id: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+):
+    """
+    Build the raw cursor and columns of a scores export
+    """
+    query = date_range_filter("date", start, end)
+    if student_id:
+        query["student_id"] = student_id
+    
+    columns = list(ScoreResponse.model_fields)
+    projection = {column: 1 for column in columns if column != "id"}
+    if not institution_id:
+        return Score.get_motor_collection().find(query, projection).sort("_id", 1), columns
+    
+    pipeline = [
+        {"$match": query},
+        {"$sort": {"_id": 1}},
+        *_institution_stages(institution_id),
+        {"$project": projection}
+    ]
+    return Score.get_motor_collection().aggregate(pipeline), columns
+
+async def get_score_stats(
+    group_by: ScoreStatsGroupBy = ScoreStatsGroupBy.SUBJECT,
+    subject: Optional[str] = None,
+    score_type: Optional[str] = None,
+    student_id: Optional[str] = None,
+    institution_id: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    bins: int = 10,
+    session: Optional[AsyncIOMotorClientSession] = None
+) -> ScoreStats:
+    """
+    Compute normalized score statistics per group with a single aggregation pipeline.
+    
+    Percentiles use $percentile and therefore need MongoDB 7.0 or newer;
+    older servers get a 503.
+    Reads use the analytics read preference; pass a causal session to include
+    the caller's own writes.
+    """
+    query = date_range_filter("date", start, end)
+    if subject:
+        query["subject"] = subject
+    if score_type:
+        query["score_type"] = score_type
+    if student_id:
+        query["student_id"] = student_id
+    
+    pipeline = [
+        {"$match": query},
+        {"$set": {"normalized": {"$cond": [
+            {"$gt": ["$max_score", 0]},
+            {"$divide": ["$score_value", "$max_score"]},
+            None
+        ]}}},
+        {"$match": {"normalized": {"$ne": None}}}
+    ]
+    
+    if institution_id or group_by == ScoreStatsGroupBy.INSTITUTION:
+        pipeline += _institution_stages(institution_id)
+    
+    # Histogram counts are summed in the same $group as the summary, one field per
+    # bin, so each group is a small document streamed from the cursor. A $facet
+    # would put every group into one result document and its 16 MB limit.
+    pipeline += [
+        {"$set": {"bin": {"$max": [0, {"$min": [bins - 1, {"$floor": {"$multiply": ["$normalized", bins]}}]}]}}},
+        {"$group": {
+            "_id": f"${group_by.value}",
+            "count": {"$sum": 1},
+            "mean": {"$avg": "$normalized"},
+            "std_dev": {"$stdDevPop": "$normalized"},
+            "min": {"$min": "$normalized"},
+            "max": {"$max": "$normalized"},
+            "percentiles": {"$percentile": {
+                "input": "$normalized",
+                "p": list(PERCENTILES),
+                "method": "approximate"
+            }},
+            **{f"bin_{b}": {"$sum": {"$cond": [{"$eq": ["$bin", b]}, 1, 0]}} for b in range(bins)}
+        }},
+        {"$sort": {"_id": 1}}
+    ]
+    
+    groups = []
+    try:
+        summaries = [
+            summary async for summary in routed_collection(Score, "analytics").aggregate(pipeline, session=session)
+        ]
+    except OperationFailure as e:
+        if e.code not in _PERCENTILE_UNSUPPORTED:
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Score statistics need MongoDB 7.0 or newer"
+        )
+    
+    for summary in summaries:
+        percentiles = dict(zip([percentile_key(p) for p in PERCENTILES], summary["percentiles"]))
+        groups.append(ScoreStatsGroup(
+            key=None if summary["_id"] is None else str(summary["_id"]),
+            count=summary["count"],
+            mean=summary["mean"],
+            median=percentiles[percentile_key(0.5)],
+            std_dev=summary["std_dev"],
+            min=summary["min"],
+            max=summary["max"],
+            percentiles=percentiles,
+            histogram=[summary[f"bin_{b}"] for b in range(bins)]
+        ))
+    
+    return ScoreStats(group_by=group_by, bins=bins, groups=groups)
+
+async def get_score_by_id(score_id: str, current_user: TokenData = None) -> ScoreResponse:
+    """
+    Get a score by ID
+    """
+    check_score_access(current_user)
+    
+    score = await Score.get_motor_collection().find_one(
+        {"_id": parse_object_id(score_id, "Score not found")},
+        score_mapper.projection
+    )
+    
+    if not score:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Score not found"
+        )
+    
+    return score_mapper.response(score)
+
+async def update_score(
+    score_id: str,
+    score_data: ScoreUpdate,
+    current_user: TokenData = None,
+    session: Optional[AsyncIOMotorClientSession] = None
+) -> ScoreResponse:
+    """
+    Update a score
+    """
+    check_score_access(current_user)
+    
+    # Update score fields
+    update_data = score_data.model_dump(exclude_unset=True)
+    update_data["updated_at"] = datetime.utcnow()
+    
+    # The pre-image comes from the write itself, so concurrent updates each see
+    # the value they replaced and their summary deltas chain instead of repeating
+    previous = await Score.get_motor_collection().find_one_and_update(
+        {"_id": parse_object_id(score_id, "Score not found")},
+        {"$set": update_data},
+        return_document=ReturnDocument.BEFORE,
+        session=session
+    )
+    
+    if not previous:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Score not found"
+        )
+    
+    old_score_value, old_max_score = previous["score_value"], previous["max_score"]
+    score = Score.model_validate({**previous, **update_data})
+    
+    if (score.score_value, score.max_score) != (old_score_value, old_max_score):
+        await apply_score_updated(score, old_score_value, old_max_score)
+    
+    return score_mapper.response(score)
+
+async def delete_score(
+    score_id: str,
+    current_user: TokenData = None,
+    session: Optional[AsyncIOMotorClientSession] = None
+) -> dict:
+    """
+    Delete a score
+    """
+    check_score_access(current_user)
+    
+    # Only the request that actually deleted the score removes it from the summary
+    deleted = await Score.get_motor_collection().find_one_and_delete(
+        {"_id": parse_object_id(score_id, "Score not found")},
+        session=session
+    )
+    
+    if not deleted:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Score not found"
+        )
+    
+    await apply_score_removed(Score.model_validate(deleted))
+    
+    return {"message": "Score deleted successfully"}
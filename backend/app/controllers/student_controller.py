@@ -1,10 +1,29 @@
 from fastapi import HTTPException, status
-from typing import List, Optional
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+from motor.motor_asyncio import AsyncIOMotorClientSession
+from pymongo.errors import DuplicateKeyError
 
-from app.models.student import Student, StudentCreate, StudentUpdate, StudentResponse
+from app.models.student import Student, StudentCreate, StudentUpdate, StudentResponse, student_mapper
 from app.config.auth import TokenData
+from app.utils.pagination import build_page_query
+from app.utils.projection import parse_fields, parse_object_id, sparse_row
+from app.utils.duplicates import duplicate_error
+from app.utils.updates import apply_partial_update
+from app.utils.consistency import routed_collection
+from app.utils.export import check_export_format, date_range_filter, stream_export
+from app.models.job import Job
+from app.services.job_runner import check_job_priority, enqueue_job
 
-async def create_student(student_data: StudentCreate, current_user: TokenData = None) -> StudentResponse:
+# Fields usable as keyset pagination sort keys besides _id
+STUDENT_SORT_FIELDS = ("institution_id", "created_at")
+
+async def create_student(
+    student_data: StudentCreate,
+    current_user: TokenData = None,
+    session: Optional[AsyncIOMotorClientSession] = None
+) -> StudentResponse:
     """
     Create a new student
     """
@@ -15,87 +34,114 @@ async def create_student(student_data: StudentCreate, current_user: TokenData =
             detail="Not enough permissions"
         )
     
-    # Check if student with same email exists
-    existing_student = await Student.find_one({"email": student_data.email})
-    if existing_student:
+    # Create new student
+    new_student = Student(**student_data.model_dump())
+    
+    # The unique user_id index rejects duplicates in the same round trip
+    try:
+        await new_student.insert(session=session)
+    except DuplicateKeyError as e:
+        raise duplicate_error(e, {"user_id": "Student record already exists for this user"})
+    
+    return student_mapper.response(new_student)
+
+async def get_students(
+    skip: int = 0,
+    limit: int = 100,
+    institution_id: Optional[str] = None,
+    after: Optional[str] = None,
+    sort_by: Optional[str] = None,
+    fields: Optional[str] = None,
+    session: Optional[AsyncIOMotorClientSession] = None
+) -> List[Dict[str, Any]]:
+    """
+    Get all students with offset or cursor pagination and optional filtering by institution,
+    as plain response dicts. With a sparse fieldset only the requested fields are returned.
+    
+    Reads use the list read preference; pass a causal session to see the caller's own writes.
+    """
+    filters = {"institution_id": institution_id} if institution_id else {}
+    query, sort_key, sort = build_page_query(filters, sort_by, after, STUDENT_SORT_FIELDS)
+    projection = parse_fields(fields, StudentResponse, always=(sort_key,))
+    
+    cursor = routed_collection(Student, "lists").find(
+        query,
+        projection or student_mapper.projection,
+        session=session
+    ).sort(sort)
+    if after is None:
+        cursor = cursor.skip(skip)
+    documents = await cursor.limit(limit).to_list(length=limit)
+    
+    if projection:
+        return [sparse_row(document, projection) for document in documents]
+    return student_mapper.payloads(documents)
+
+async def export_students(
+    export_format: str = "ndjson",
+    batch_size: int = 500,
+    institution_id: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    current_user: TokenData = None,
+    background: bool = False,
+    priority: int = 0
+) -> Union[StreamingResponse, Job]:
+    """
+    Stream students as NDJSON or CSV straight from a database cursor,
+    or queue the export as a background job writing a file
+    """
+    # Only admins and teachers can export students
+    if current_user and current_user.role not in ["admin", "teacher"]:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Student with this email already exists"
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
         )
     
-    # Create new student
-    new_student = Student(
-        first_name=student_data.first_name,
-        last_name=student_data.last_name,
-        email=student_data.email,
-        date_of_birth=student_data.date_of_birth,
-        gender=student_data.gender,
-        address=student_data.address,
-        phone=student_data.phone,
-        institution_id=student_data.institution_id,
-        grade=student_data.grade,
-        enrollment_date=student_data.enrollment_date,
-        parent_guardian_name=student_data.parent_guardian_name,
-        parent_guardian_phone=student_data.parent_guardian_phone,
-        parent_guardian_email=student_data.parent_guardian_email
-    )
+    check_export_format(export_format)
+    if background:
+        check_job_priority(priority, current_user)
+        return await enqueue_job(
+            "students_export",
+            {
+                "export_format": export_format,
+                "batch_size": batch_size,
+                "institution_id": institution_id,
+                "start": start,
+                "end": end
+            },
+            created_by=current_user.user_id if current_user else None,
+            priority=priority
+        )
     
-    await new_student.insert()
-    
-    return StudentResponse(
-        id=str(new_student.id),
-        first_name=new_student.first_name,
-        last_name=new_student.last_name,
-        email=new_student.email,
-        date_of_birth=new_student.date_of_birth,
-        gender=new_student.gender,
-        address=new_student.address,
-        phone=new_student.phone,
-        institution_id=new_student.institution_id,
-        grade=new_student.grade,
-        enrollment_date=new_student.enrollment_date,
-        parent_guardian_name=new_student.parent_guardian_name,
-        parent_guardian_phone=new_student.parent_guardian_phone,
-        parent_guardian_email=new_student.parent_guardian_email,
-        created_at=new_student.created_at,
-        updated_at=new_student.updated_at
-    )
+    cursor, columns = students_export_cursor(institution_id, start, end)
+    return stream_export(cursor, columns, export_format, batch_size, "students")
 
-async def get_students(skip: int = 0, limit: int = 100, institution_id: Optional[str] = None) -> List[StudentResponse]:
+def students_export_cursor(
+    institution_id: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+):
     """
-    Get all students with pagination and optional filtering by institution
+    Build the raw cursor and columns of a students export
     """
+    query = date_range_filter("created_at", start, end)
     if institution_id:
-        students = await Student.find({"institution_id": institution_id}).skip(skip).limit(limit).to_list()
-    else:
-        students = await Student.find_all().skip(skip).limit(limit).to_list()
-    
-    return [
-        StudentResponse(
-            id=str(student.id),
-            first_name=student.first_name,
-            last_name=student.last_name,
-            email=student.email,
-            date_of_birth=student.date_of_birth,
-            gender=student.gender,
-            address=student.address,
-            phone=student.phone,
-            institution_id=student.institution_id,
-            grade=student.grade,
-            enrollment_date=student.enrollment_date,
-            parent_guardian_name=student.parent_guardian_name,
-            parent_guardian_phone=student.parent_guardian_phone,
-            parent_guardian_email=student.parent_guardian_email,
-            created_at=student.created_at,
-            updated_at=student.updated_at
-        ) for student in students
-    ]
+        query["institution_id"] = institution_id
+    
+    columns = list(StudentResponse.model_fields)
+    projection = {column: 1 for column in columns if column != "id"}
+    cursor = Student.get_motor_collection().find(query, projection).sort("_id", 1)
+    return cursor, columns
 
 async def get_student_by_id(student_id: str) -> StudentResponse:
     """
     Get a student by ID
     """
-    student = await Student.get(student_id)
+    student = await Student.get_motor_collection().find_one(
+        {"_id": parse_object_id(student_id, "Student not found")},
+        student_mapper.projection
+    )
     
     if not student:
         raise HTTPException(
@@ -103,26 +149,14 @@ async def get_student_by_id(student_id: str) -> StudentResponse:
             detail="Student not found"
         )
     
-    return StudentResponse(
-        id=str(student.id),
-        first_name=student.first_name,
-        last_name=student.last_name,
-        email=student.email,
-        date_of_birth=student.date_of_birth,
-        gender=student.gender,
-        address=student.address,
-        phone=student.phone,
-        institution_id=student.institution_id,
-        grade=student.grade,
-        enrollment_date=student.enrollment_date,
-        parent_guardian_name=student.parent_guardian_name,
-        parent_guardian_phone=student.parent_guardian_phone,
-        parent_guardian_email=student.parent_guardian_email,
-        created_at=student.created_at,
-        updated_at=student.updated_at
-    )
+    return student_mapper.response(student)
 
-async def update_student(student_id: str, student_data: StudentUpdate, current_user: TokenData = None) -> StudentResponse:
+async def update_student(
+    student_id: str,
+    student_data: StudentUpdate,
+    current_user: TokenData = None,
+    session: Optional[AsyncIOMotorClientSession] = None
+) -> StudentResponse:
     """
     Update a student
     """
@@ -133,42 +167,20 @@ async def update_student(student_id: str, student_data: StudentUpdate, current_u
             detail="Not enough permissions"
         )
     
-    student = await Student.get(student_id)
-    
-    if not student:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Student not found"
-        )
-    
-    # Update student fields
-    update_data = student_data.dict(exclude_unset=True)
-    
-    for field, value in update_data.items():
-        setattr(student, field, value)
-    
-    await student.save()
-    
-    return StudentResponse(
-        id=str(student.id),
-        first_name=student.first_name,
-        last_name=student.last_name,
-        email=student.email,
-        date_of_birth=student.date_of_birth,
-        gender=student.gender,
-        address=student.address,
-        phone=student.phone,
-        institution_id=student.institution_id,
-        grade=student.grade,
-        enrollment_date=student.enrollment_date,
-        parent_guardian_name=student.parent_guardian_name,
-        parent_guardian_phone=student.parent_guardian_phone,
-        parent_guardian_email=student.parent_guardian_email,
-        created_at=student.created_at,
-        updated_at=student.updated_at
+    # Only the sent fields are written, in a single round trip
+    return await apply_partial_update(
+        student_mapper,
+        parse_object_id(student_id, "Student not found"),
+        student_data,
+        "Student not found",
+        session
     )
 
-async def delete_student(student_id: str, current_user: TokenData = None) -> dict:
+async def delete_student(
+    student_id: str,
+    current_user: TokenData = None,
+    session: Optional[AsyncIOMotorClientSession] = None
+) -> dict:
     """
     Delete a student
     """
@@ -179,7 +191,7 @@ async def delete_student(student_id: str, current_user: TokenData = None) -> dic
             detail="Not enough permissions"
         )
     
-    student = await Student.get(student_id)
+    student = await Student.get(student_id, session=session)
     
     if not student:
         raise HTTPException(
@@ -187,6 +199,6 @@ async def delete_student(student_id: str, current_user: TokenData = None) -> dic
             detail="Student not found"
         )
     
-    await student.delete()
+    await student.delete(session=session)
     
     return {"message": "Student deleted successfully"}
\ No newline at end of file
@@ -1,12 +1,29 @@
 from fastapi import HTTPException, status, Depends
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
+from pymongo.errors import DuplicateKeyError
 
-from app.models.user import User, UserUpdate, UserResponse
+from app.models.user import User, UserUpdate, UserResponse, user_mapper
 from app.config.auth import get_current_user, TokenData
+from app.utils.pagination import build_page_query
+from app.utils.projection import parse_fields, parse_object_id, sparse_row
+from app.utils.duplicates import duplicate_error
+from app.utils.updates import apply_partial_update
+from app.controllers.auth_controller import USER_DUPLICATE_MESSAGES
 
-async def get_users(skip: int = 0, limit: int = 100, current_user: TokenData = None) -> List[UserResponse]:
+# Fields usable as keyset pagination sort keys besides _id
+USER_SORT_FIELDS = ("institution_id", "created_at")
+
+async def get_users(
+    skip: int = 0,
+    limit: int = 100,
+    current_user: TokenData = None,
+    after: Optional[str] = None,
+    sort_by: Optional[str] = None,
+    fields: Optional[str] = None
+) -> List[Dict[str, Any]]:
     """
-    Get all users with pagination
+    Get all users with offset or cursor pagination as plain response dicts.
+    With a sparse fieldset only the requested fields are returned.
     """
     # Only admins can see all users
     if current_user and current_user.role != "admin":
@@ -15,22 +32,17 @@ async def get_users(skip: int = 0, limit: int = 100, current_user: TokenData = N
             detail="Not enough permissions"
         )
     
-    users = await User.find_all().skip(skip).limit(limit).to_list()
+    query, sort_key, sort = build_page_query({}, sort_by, after, USER_SORT_FIELDS)
+    projection = parse_fields(fields, UserResponse, always=(sort_key,))
+    
+    cursor = User.get_motor_collection().find(query, projection or user_mapper.projection).sort(sort)
+    if after is None:
+        cursor = cursor.skip(skip)
+    documents = await cursor.limit(limit).to_list(length=limit)
     
-    return [
-        UserResponse(
-            id=str(user.id),
-            email=user.email,
-            username=user.username,
-            first_name=user.first_name,
-            last_name=user.last_name,
-            role=user.role,
-            is_active=user.is_active,
-            created_at=user.created_at,
-            updated_at=user.updated_at,
-            institution_id=user.institution_id
-        ) for user in users
-    ]
+    if projection:
+        return [sparse_row(document, projection) for document in documents]
+    return user_mapper.payloads(documents)
 
 async def get_user_by_id(user_id: str, current_user: TokenData = None) -> UserResponse:
     """
@@ -43,7 +55,10 @@ async def get_user_by_id(user_id: str, current_user: TokenData = None) -> UserRe
             detail="Not enough permissions"
         )
     
-    user = await User.get(user_id)
+    user = await User.get_motor_collection().find_one(
+        {"_id": parse_object_id(user_id, "User not found")},
+        user_mapper.projection
+    )
     
     if not user:
         raise HTTPException(
@@ -51,18 +66,7 @@ async def get_user_by_id(user_id: str, current_user: TokenData = None) -> UserRe
             detail="User not found"
         )
     
-    return UserResponse(
-        id=str(user.id),
-        email=user.email,
-        username=user.username,
-        first_name=user.first_name,
-        last_name=user.last_name,
-        role=user.role,
-        is_active=user.is_active,
-        created_at=user.created_at,
-        updated_at=user.updated_at,
-        institution_id=user.institution_id
-    )
+    return user_mapper.response(user)
 
 async def update_user(user_id: str, user_data: UserUpdate, current_user: TokenData = None) -> UserResponse:
     """
@@ -75,34 +79,16 @@ async def update_user(user_id: str, user_data: UserUpdate, current_user: TokenDa
             detail="Not enough permissions"
         )
     
-    user = await User.get(user_id)
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
+    # Only the sent fields are written, in a single round trip
+    try:
+        return await apply_partial_update(
+            user_mapper,
+            parse_object_id(user_id, "User not found"),
+            user_data,
+            "User not found"
         )
-    
-    # Update user fields
-    update_data = user_data.dict(exclude_unset=True)
-    
-    for field, value in update_data.items():
-        setattr(user, field, value)
-    
-    await user.save()
-    
-    return UserResponse(
-        id=str(user.id),
-        email=user.email,
-        username=user.username,
-        first_name=user.first_name,
-        last_name=user.last_name,
-        role=user.role,
-        is_active=user.is_active,
-        created_at=user.created_at,
-        updated_at=user.updated_at,
-        institution_id=user.institution_id
-    )
+    except DuplicateKeyError as e:
+        raise duplicate_error(e, USER_DUPLICATE_MESSAGES)
 
 async def delete_user(user_id: str, current_user: TokenData = None) -> dict:
     """
@@ -0,0 +1,23 @@
+from typing import Any, Dict
+from datetime import datetime
+from beanie import Document
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+
+class AIResponseCache(Document):
+    """
+    Cached AI generation result addressed by the hash of its normalized request
+    """
+    key: str
+    kind: str
+    response: Dict[str, Any]
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime
+    
+    class Settings:
+        name = "ai_response_cache"
+        indexes = [
+            IndexModel([("key", ASCENDING)], unique=True),
+            # Mongo removes entries once expires_at has passed
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0)
+        ]
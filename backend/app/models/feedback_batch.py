@@ -0,0 +1,84 @@
+from typing import Optional, List
+from datetime import datetime
+from enum import Enum
+from beanie import Document
+from pydantic import BaseModel, Field, model_validator
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+class FeedbackBatchStatus(str, Enum):
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class FeedbackItemStatus(str, Enum):
+    PENDING = "pending"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class FeedbackItem(BaseModel):
+    student_id: str
+    student_name: str
+    performance: str
+    areas_to_improve: List[str] = []
+    status: FeedbackItemStatus = FeedbackItemStatus.PENDING
+    feedback: Optional[str] = None
+    error: Optional[str] = None
+    completed_at: Optional[datetime] = None
+
+class FeedbackBatch(Document):
+    """
+    Feedback generation for a group of students, updated as each student completes
+    """
+    created_by: Optional[str] = None
+    subject: str
+    institution_id: Optional[str] = None
+    grade: Optional[str] = None
+    status: FeedbackBatchStatus = FeedbackBatchStatus.RUNNING
+    total: int = 0
+    completed: int = 0
+    failed: int = 0
+    items: List[FeedbackItem] = []
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    class Settings:
+        name = "feedback_batches"
+        indexes = [
+            IndexModel([("created_by", ASCENDING), ("created_at", DESCENDING)])
+        ]
+
+# Pydantic models for request/response
+class FeedbackBatchStudent(BaseModel):
+    student_id: str
+    # Derived from the user record and score summary when omitted
+    student_name: Optional[str] = None
+    performance: Optional[str] = None
+    areas_to_improve: Optional[List[str]] = None
+
+class FeedbackBatchCreate(BaseModel):
+    subject: str
+    # Either explicit students, or a class selected by institution and grade
+    students: List[FeedbackBatchStudent] = []
+    institution_id: Optional[str] = None
+    grade: Optional[str] = None
+    areas_to_improve: List[str] = []
+    
+    @model_validator(mode="after")
+    def check_selection(self):
+        if not self.students and not self.institution_id:
+            raise ValueError("Provide students or an institution_id")
+        return self
+
+class FeedbackBatchResponse(BaseModel):
+    id: str
+    created_by: Optional[str] = None
+    subject: str
+    institution_id: Optional[str] = None
+    grade: Optional[str] = None
+    status: FeedbackBatchStatus
+    total: int
+    completed: int
+    failed: int
+    items: List[FeedbackItem]
+    created_at: datetime
+    updated_at: datetime
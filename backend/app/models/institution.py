@@ -2,6 +2,9 @@ from typing import Optional, List
 from datetime import datetime
 from beanie import Document, Link
 from pydantic import BaseModel, Field
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from app.utils.mapper import ResponseMapper
 
 class Institution(Document):
     """
@@ -17,10 +20,17 @@ class Institution(Document):
     website: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    version: int = 0
     
     class Settings:
         name = "institutions"
         use_state_management = True
+        indexes = [
+            IndexModel([("name", ASCENDING)], unique=True),
+            IndexModel([("created_at", ASCENDING), ("_id", ASCENDING)]),
+            # Latest change, for the listing ETag
+            IndexModel([("updated_at", DESCENDING)])
+        ]
 
 # Pydantic models for request/response
 class InstitutionCreate(BaseModel):
@@ -42,6 +52,8 @@ class InstitutionUpdate(BaseModel):
     zip_code: Optional[str] = None
     phone: Optional[str] = None
     website: Optional[str] = None
+    # Current version for optimistic concurrency; omit to overwrite unconditionally
+    version: Optional[int] = None
 
 class InstitutionResponse(BaseModel):
     id: str
@@ -55,6 +67,10 @@ class InstitutionResponse(BaseModel):
     website: Optional[str] = None
     created_at: datetime
     updated_at: datetime
+    version: int = 0
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# Stored institutions as InstitutionResponse
+institution_mapper = ResponseMapper(Institution, InstitutionResponse)
@@ -0,0 +1,66 @@
+from typing import Any, Dict, Optional
+from datetime import datetime
+from enum import Enum
+from beanie import Document
+from pydantic import BaseModel, Field
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class Job(Document):
+    """
+    Unit of background work, claimed atomically by one worker at a time
+    """
+    type: str
+    params: Dict[str, Any] = {}
+    priority: int = 0
+    status: JobStatus = JobStatus.QUEUED
+    attempts: int = 0
+    max_attempts: int = 3
+    created_by: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    result_file_id: Optional[str] = None
+    error: Optional[str] = None
+    lease_owner: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    run_after: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    # Set once the job finishes; Mongo removes the job when it passes
+    expires_at: Optional[datetime] = None
+    
+    class Settings:
+        name = "jobs"
+        indexes = [
+            # Serves the claim query: next runnable job of a type by priority
+            IndexModel([
+                ("type", ASCENDING),
+                ("status", ASCENDING),
+                ("priority", DESCENDING),
+                ("run_after", ASCENDING)
+            ]),
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0)
+        ]
+
+# Pydantic models for response
+class JobResponse(BaseModel):
+    id: str
+    type: str
+    params: Dict[str, Any]
+    priority: int
+    status: JobStatus
+    attempts: int
+    max_attempts: int
+    created_by: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    result_url: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
@@ -1,8 +1,11 @@
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import datetime
 from beanie import Document, Link
 from pydantic import BaseModel, Field
 from enum import Enum
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from app.utils.mapper import ResponseMapper
 
 class ScoreType(str, Enum):
     EXAM = "exam"
@@ -14,7 +17,7 @@ class Score(Document):
     """
     Score model for student assessments
     """
-    student_id: str = Field(..., index=True)
+    student_id: str
     subject: str
     score_value: float
     max_score: float
@@ -28,6 +31,10 @@ class Score(Document):
     class Settings:
         name = "scores"
         use_state_management = True
+        indexes = [
+            IndexModel([("student_id", ASCENDING), ("subject", ASCENDING), ("date", DESCENDING)]),
+            IndexModel([("date", ASCENDING)])
+        ]
 
 # Pydantic models for request/response
 class ScoreCreate(BaseModel):
@@ -59,4 +66,42 @@ class ScoreResponse(BaseModel):
     updated_at: datetime
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# Stored scores as ScoreResponse
+score_mapper = ResponseMapper(Score, ScoreResponse)
+
+class ScoreRowError(BaseModel):
+    index: int
+    detail: str
+    errors: List[Dict[str, Any]] = []
+
+class ScoreBatchResult(BaseModel):
+    inserted_count: int
+    inserted_ids: List[str]
+    errors: List[ScoreRowError]
+
+class ScoreStatsGroupBy(str, Enum):
+    SUBJECT = "subject"
+    SCORE_TYPE = "score_type"
+    STUDENT = "student_id"
+    INSTITUTION = "institution_id"
+
+class ScoreStatsGroup(BaseModel):
+    """
+    Statistics of normalized scores (score_value / max_score) for one group
+    """
+    key: Optional[str] = None
+    count: int
+    mean: float
+    median: float
+    std_dev: float
+    min: float
+    max: float
+    percentiles: Dict[str, float]
+    histogram: List[int]
+
+class ScoreStats(BaseModel):
+    group_by: ScoreStatsGroupBy
+    bins: int
+    groups: List[ScoreStatsGroup]
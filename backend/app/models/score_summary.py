@@ -0,0 +1,45 @@
+from typing import Optional, List
+from datetime import datetime
+from beanie import Document
+from pydantic import BaseModel, Field
+from pymongo import ASCENDING, IndexModel
+
+class RecentScore(BaseModel):
+    score_id: str
+    value: float
+    date: datetime
+
+class StudentScoreSummary(Document):
+    """
+    Materialized running totals of a student's normalized scores in one subject
+    """
+    student_id: str
+    subject: str
+    value_count: int = 0
+    value_sum: float = 0.0
+    value_sum_sq: float = 0.0
+    min_value: Optional[float] = None
+    max_value: Optional[float] = None
+    recent: List[RecentScore] = []
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    class Settings:
+        name = "student_score_summary"
+        indexes = [
+            IndexModel([("student_id", ASCENDING), ("subject", ASCENDING)], unique=True)
+        ]
+
+# Pydantic models for response
+class SubjectSummaryResponse(BaseModel):
+    subject: str
+    count: int
+    mean: float
+    std_dev: float
+    min: float
+    max: float
+    recent: List[RecentScore]
+    updated_at: datetime
+
+class StudentScoreSummaryResponse(BaseModel):
+    student_id: str
+    subjects: List[SubjectSummaryResponse]
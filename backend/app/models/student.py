@@ -2,22 +2,34 @@ from typing import Optional, List
 from datetime import datetime
 from beanie import Document, Link
 from pydantic import BaseModel, Field
+from pymongo import ASCENDING, IndexModel
+
+from app.utils.mapper import ResponseMapper
 
 class Student(Document):
     """
     Student model for educational platform
     """
-    user_id: str = Field(..., index=True)
-    institution_id: str = Field(..., index=True)
+    user_id: str
+    institution_id: str
     grade: str
     enrollment_year: int
     graduation_year: Optional[int] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    version: int = 0
     
     class Settings:
         name = "students"
         use_state_management = True
+        indexes = [
+            # One student record per user account
+            IndexModel([("user_id", ASCENDING)], unique=True),
+            IndexModel([("institution_id", ASCENDING), ("grade", ASCENDING)]),
+            # Keyset pages of one institution
+            IndexModel([("institution_id", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("created_at", ASCENDING), ("_id", ASCENDING)])
+        ]
 
 # Pydantic models for request/response
 class StudentCreate(BaseModel):
@@ -31,6 +43,8 @@ class StudentUpdate(BaseModel):
     grade: Optional[str] = None
     enrollment_year: Optional[int] = None
     graduation_year: Optional[int] = None
+    # Current version for optimistic concurrency; omit to overwrite unconditionally
+    version: Optional[int] = None
 
 class StudentResponse(BaseModel):
     id: str
@@ -41,6 +55,10 @@ class StudentResponse(BaseModel):
     graduation_year: Optional[int] = None
     created_at: datetime
     updated_at: datetime
+    version: int = 0
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# Stored students as StudentResponse
+student_mapper = ResponseMapper(Student, StudentResponse)
@@ -3,6 +3,9 @@ from datetime import datetime
 from beanie import Document, Link
 from pydantic import BaseModel, EmailStr, Field
 from enum import Enum
+from pymongo import ASCENDING, IndexModel
+
+from app.utils.mapper import ResponseMapper
 
 class UserRole(str, Enum):
     ADMIN = "admin"
@@ -13,8 +16,8 @@ class User(Document):
     """
     User model for authentication and authorization
     """
-    email: EmailStr = Field(..., unique=True, index=True)
-    username: str = Field(..., min_length=3, max_length=50, unique=True, index=True)
+    email: EmailStr
+    username: str = Field(..., min_length=3, max_length=50)
     hashed_password: str
     first_name: str
     last_name: str
@@ -23,10 +26,17 @@ class User(Document):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     institution_id: Optional[str] = None
+    version: int = 0
     
     class Settings:
         name = "users"
         use_state_management = True
+        indexes = [
+            IndexModel([("email", ASCENDING)], unique=True),
+            IndexModel([("username", ASCENDING)], unique=True),
+            IndexModel([("institution_id", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("created_at", ASCENDING), ("_id", ASCENDING)])
+        ]
 
 # Pydantic models for request/response
 class UserCreate(BaseModel):
@@ -44,6 +54,8 @@ class UserUpdate(BaseModel):
     last_name: Optional[str] = None
     is_active: Optional[bool] = None
     institution_id: Optional[str] = None
+    # Current version for optimistic concurrency; omit to overwrite unconditionally
+    version: Optional[int] = None
 
 class UserResponse(BaseModel):
     id: str
@@ -56,6 +68,10 @@ class UserResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     institution_id: Optional[str] = None
+    version: int = 0
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# Stored users as UserResponse, leaving out hashed_password
+user_mapper = ResponseMapper(User, UserResponse)
@@ -1,14 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 
 from app.services.ai_service import (
-    generate_lesson_plan,
-    generate_quiz_questions,
-    analyze_student_performance,
-    generate_feedback
+    lesson_plan_generation,
+    quiz_generation,
+    performance_analysis_generation,
+    feedback_generation,
+    run_generation,
+    stream_generation,
+    ai_requests_in_flight
 )
+from app.services.ai_cache import ai_cache
+from app.services.ai_client import get_ai_client
+from app.services.feedback_batch_service import (
+    create_feedback_batch,
+    get_feedback_batch,
+    stream_feedback_batch,
+    feedback_batch_response
+)
+from app.services.job_runner import JOB_MAX_PRIORITY, JOB_MIN_PRIORITY, check_job_priority, enqueue_job, job_response
+from app.controllers.score_controller import get_score_stats
+from app.models.feedback_batch import FeedbackBatchCreate, FeedbackBatchResponse
+from app.models.score import ScoreStatsGroupBy
 from app.config.auth import get_current_user, TokenData
+from app.utils.sse import stream_sse
+from app.utils.responses import APIResponse
 
 router = APIRouter()
 
@@ -31,8 +49,11 @@ class ScoreData(BaseModel):
     assessment_type: str
 
 class PerformanceAnalysisRequest(BaseModel):
-    scores: List[ScoreData]
     subject: str
+    # Either raw scores, or filters selecting stored scores to aggregate server-side
+    scores: List[ScoreData] = []
+    student_id: Optional[str] = None
+    institution_id: Optional[str] = None
 
 class FeedbackRequest(BaseModel):
     student_name: str
@@ -40,9 +61,16 @@ class FeedbackRequest(BaseModel):
     performance: str
     areas_to_improve: List[str]
 
+def _accepted(job) -> APIResponse:
+    return APIResponse(job_response(job), status_code=status.HTTP_202_ACCEPTED)
+
 @router.post("/lesson-plan", response_model=Dict[str, Any])
 async def create_lesson_plan(
     request: LessonPlanRequest,
+    cache: Optional[str] = Query(None, description="Set to 'bypass' to skip the response cache"),
+    stream: bool = Query(False, description="Stream tokens as Server-Sent Events"),
+    background: bool = Query(False, description="Run as a background job and return its status"),
+    priority: int = Query(0, ge=JOB_MIN_PRIORITY, le=JOB_MAX_PRIORITY, description="Background job priority, higher runs first"),
     current_user: TokenData = Depends(get_current_user)
 ):
     """
@@ -55,16 +83,28 @@ async def create_lesson_plan(
             detail="Not enough permissions"
         )
     
-    return await generate_lesson_plan(
-        request.subject,
-        request.grade,
-        request.topic,
-        request.duration
-    )
+    if background:
+        check_job_priority(priority, current_user)
+        job = await enqueue_job(
+            "lesson_plan",
+            {**request.model_dump(), "use_cache": cache != "bypass"},
+            created_by=current_user.user_id,
+            priority=priority
+        )
+        return _accepted(job)
+    
+    generation = lesson_plan_generation(request.subject, request.grade, request.topic, request.duration)
+    if stream:
+        return stream_sse(stream_generation(generation, use_cache=cache != "bypass", user_id=current_user.user_id))
+    return await run_generation(generation, use_cache=cache != "bypass", user_id=current_user.user_id)
 
 @router.post("/quiz", response_model=Dict[str, Any])
 async def create_quiz(
     request: QuizRequest,
+    cache: Optional[str] = Query(None, description="Set to 'bypass' to skip the response cache"),
+    stream: bool = Query(False, description="Stream tokens as Server-Sent Events"),
+    background: bool = Query(False, description="Run as a background job and return its status"),
+    priority: int = Query(0, ge=JOB_MIN_PRIORITY, le=JOB_MAX_PRIORITY, description="Background job priority, higher runs first"),
     current_user: TokenData = Depends(get_current_user)
 ):
     """
@@ -77,16 +117,25 @@ async def create_quiz(
             detail="Not enough permissions"
         )
     
-    return await generate_quiz_questions(
-        request.subject,
-        request.grade,
-        request.topic,
-        request.num_questions
-    )
+    if background:
+        check_job_priority(priority, current_user)
+        job = await enqueue_job(
+            "quiz",
+            {**request.model_dump(), "use_cache": cache != "bypass"},
+            created_by=current_user.user_id,
+            priority=priority
+        )
+        return _accepted(job)
+    
+    generation = quiz_generation(request.subject, request.grade, request.topic, request.num_questions)
+    if stream:
+        return stream_sse(stream_generation(generation, use_cache=cache != "bypass", user_id=current_user.user_id))
+    return await run_generation(generation, use_cache=cache != "bypass", user_id=current_user.user_id)
 
 @router.post("/analyze-performance", response_model=Dict[str, Any])
 async def analyze_performance(
     request: PerformanceAnalysisRequest,
+    stream: bool = Query(False, description="Stream tokens as Server-Sent Events"),
     current_user: TokenData = Depends(get_current_user)
 ):
     """
@@ -99,14 +148,38 @@ async def analyze_performance(
             detail="Not enough permissions"
         )
     
-    return await analyze_student_performance(
-        [score.dict() for score in request.scores],
-        request.subject
+    if request.scores:
+        generation = performance_analysis_generation(
+            [score.model_dump() for score in request.scores],
+            request.subject
+        )
+    else:
+        generation = await _stored_scores_analysis(request)
+    
+    if stream:
+        return stream_sse(stream_generation(generation, user_id=current_user.user_id))
+    return await run_generation(generation, user_id=current_user.user_id)
+
+async def _stored_scores_analysis(request: PerformanceAnalysisRequest):
+    # Use precomputed statistics of stored scores instead of shipping raw rows
+    stats = await get_score_stats(
+        ScoreStatsGroupBy.SCORE_TYPE,
+        subject=request.subject,
+        student_id=request.student_id,
+        institution_id=request.institution_id
     )
+    if not stats.groups:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No scores found for analysis"
+        )
+    
+    return performance_analysis_generation([], request.subject, stats.model_dump(mode="json"))
 
 @router.post("/feedback", response_model=Dict[str, Any])
 async def create_feedback(
     request: FeedbackRequest,
+    stream: bool = Query(False, description="Stream tokens as Server-Sent Events"),
     current_user: TokenData = Depends(get_current_user)
 ):
     """
@@ -119,9 +192,81 @@ async def create_feedback(
             detail="Not enough permissions"
         )
     
-    return await generate_feedback(
+    generation = feedback_generation(
         request.student_name,
         request.subject,
         request.performance,
         request.areas_to_improve
-    )
\ No newline at end of file
+    )
+    if stream:
+        return stream_sse(stream_generation(generation, user_id=current_user.user_id))
+    return await run_generation(generation, user_id=current_user.user_id)
+
+@router.post("/feedback/batch", response_model=FeedbackBatchResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_feedback_batch_job(
+    request: FeedbackBatchCreate,
+    stream: bool = Query(False, description="Stream results as NDJSON as each student completes"),
+    background: bool = Query(False, description="Return the status of the batch's job instead of the batch"),
+    priority: int = Query(0, ge=JOB_MIN_PRIORITY, le=JOB_MAX_PRIORITY, description="Background job priority, higher runs first"),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    Generate feedback for a list of students or a whole class in the background
+    """
+    # Only teachers and admins can generate feedback
+    if current_user.role not in ["teacher", "admin"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    check_job_priority(priority, current_user)
+    batch = await create_feedback_batch(request, current_user)
+    # Batches always run as jobs so one interrupted by a restart is picked up again
+    job = await enqueue_job(
+        "feedback_batch",
+        {"batch_id": str(batch.id)},
+        created_by=current_user.user_id,
+        priority=priority
+    )
+    if background:
+        return _accepted(job)
+    if stream:
+        return StreamingResponse(
+            stream_feedback_batch(batch),
+            media_type="application/x-ndjson",
+            headers={"Location": f"/api/ai/feedback/batch/{batch.id}"}
+        )
+    return feedback_batch_response(batch)
+
+@router.get("/feedback/batch/{batch_id}", response_model=FeedbackBatchResponse)
+async def read_feedback_batch(
+    batch_id: str,
+    stream: bool = Query(False, description="Stream results as NDJSON as each student completes"),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    Get the progress and results of a feedback batch
+    """
+    batch = await get_feedback_batch(batch_id, current_user)
+    if stream:
+        return StreamingResponse(stream_feedback_batch(batch), media_type="application/x-ndjson")
+    return feedback_batch_response(batch)
+
+@router.get("/cache/stats", response_model=Dict[str, Any])
+async def read_cache_stats(current_user: TokenData = Depends(get_current_user)):
+    """
+    Get hit-rate metrics of the AI response cache, request coalescing and the upstream client
+    """
+    # Only admins can inspect cache metrics
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    return {
+        **ai_cache.stats(),
+        "coalescing": ai_requests_in_flight.stats(),
+        "upstream": get_ai_client().stats()
+    }
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, HTTPException, status
+from typing import Any, Dict
+
+from app.config.database import ping_db, pool_metrics
+from app.services.institution_cache import institution_cache
+
+router = APIRouter()
+
+@router.get("/db", response_model=Dict[str, Any])
+async def read_db_health():
+    """
+    Check database connectivity and report connection pool usage
+    """
+    try:
+        ping_ms = await ping_db()
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database unavailable"
+        )
+    
+    return {"status": "ok", "ping_ms": ping_ms, "pool": pool_metrics.stats()}
+
+@router.get("/cache", response_model=Dict[str, Any])
+async def read_cache_health():
+    """
+    Report hit ratios and invalidation mode of the in-process caches
+    """
+    return {"institutions": institution_cache.stats()}
@@ -1,59 +1,111 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query, Response
+from typing import List, Optional
 
 from app.models.institution import InstitutionCreate, InstitutionUpdate, InstitutionResponse
 from app.controllers.institution_controller import (
     create_institution,
     get_institutions,
+    get_institutions_etag,
     get_institution_by_id,
     update_institution,
     delete_institution
 )
 from app.config.auth import get_current_user, TokenData
+from app.utils.pagination import next_cursor_headers, resolve_sort_key
+from app.utils.responses import APIResponse
+from app.utils.http_cache import cache_headers, document_etag, etag_matches, not_modified, set_cache_headers
+from app.utils.consistency import causal_session, causal_token_headers, read_causal_token, set_causal_token
 
 router = APIRouter()
 
 @router.post("/", response_model=InstitutionResponse, status_code=status.HTTP_201_CREATED)
 async def create_institution_endpoint(
     institution_data: InstitutionCreate,
+    response: Response,
     current_user: TokenData = Depends(get_current_user)
 ):
     """
     Create a new institution
     """
-    return await create_institution(institution_data, current_user)
+    async with causal_session() as session:
+        institution = await create_institution(institution_data, current_user, session)
+        set_causal_token(response, session)
+    return institution
 
 @router.get("/", response_model=List[InstitutionResponse])
-async def read_institutions(skip: int = 0, limit: int = 100):
+async def read_institutions(
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[str] = Query(None, description="Cursor from X-Next-Cursor; replaces skip"),
+    sort_by: Optional[str] = Query(None, description="Sort key: _id or created_at"),
+    fields: Optional[str] = Query(None, description="Comma separated sparse fieldset"),
+    causal_token: Optional[str] = Depends(read_causal_token),
+    if_none_match: Optional[str] = Header(None)
+):
     """
-    Get all institutions with pagination
+    Get all institutions with pagination, answering 304 while the collection is unchanged
     """
-    return await get_institutions(skip, limit)
+    sort_key = resolve_sort_key(sort_by, after)
+    async with causal_session(causal_token) as session:
+        # Checking the collection version is much cheaper than reading the page
+        # A causal token asks for the caller's own writes, which only the database guarantees
+        use_cache = causal_token is None
+        etag = await get_institutions_etag(session, use_cache)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, "institutions")
+        institutions = await get_institutions(skip, limit, after, sort_key, fields, session, use_cache)
+    
+    return APIResponse(
+        institutions,
+        headers={
+            **next_cursor_headers(institutions, limit, sort_key),
+            **causal_token_headers(session),
+            **cache_headers(etag, "institutions")
+        }
+    )
 
 @router.get("/{institution_id}", response_model=InstitutionResponse)
-async def read_institution(institution_id: str):
+async def read_institution(
+    institution_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None)
+):
     """
-    Get an institution by ID
+    Get an institution by ID, answering 304 when the client's copy is current
     """
-    return await get_institution_by_id(institution_id)
+    institution = await get_institution_by_id(institution_id)
+    
+    etag = document_etag(institution)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, "institution")
+    set_cache_headers(response, etag, "institution")
+    return institution
 
 @router.put("/{institution_id}", response_model=InstitutionResponse)
 async def update_institution_endpoint(
     institution_id: str,
     institution_data: InstitutionUpdate,
+    response: Response,
     current_user: TokenData = Depends(get_current_user)
 ):
     """
     Update an institution
     """
-    return await update_institution(institution_id, institution_data, current_user)
+    async with causal_session() as session:
+        institution = await update_institution(institution_id, institution_data, current_user, session)
+        set_causal_token(response, session)
+    return institution
 
 @router.delete("/{institution_id}", response_model=dict)
 async def delete_institution_endpoint(
     institution_id: str,
+    response: Response,
     current_user: TokenData = Depends(get_current_user)
 ):
     """
     Delete an institution
     """
-    return await delete_institution(institution_id, current_user)
\ No newline at end of file
+    async with causal_session() as session:
+        result = await delete_institution(institution_id, current_user, session)
+        set_causal_token(response, session)
+    return result
\ No newline at end of file
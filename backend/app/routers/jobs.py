@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from bson import ObjectId
+from gridfs.errors import NoFile
+
+from app.models.job import JobResponse
+from app.services.job_runner import get_job, job_files, job_response
+from app.config.auth import get_current_user, TokenData
+from app.utils.export import stream_saved_export
+
+router = APIRouter()
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def read_job(job_id: str, current_user: TokenData = Depends(get_current_user)):
+    """
+    Get the status and result of a background job
+    """
+    return job_response(await get_job(job_id, current_user))
+
+@router.get("/{job_id}/result")
+async def read_job_result(job_id: str, current_user: TokenData = Depends(get_current_user)):
+    """
+    Download the file produced by a background job
+    """
+    job = await get_job(job_id, current_user)
+    if not job.result_file_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job has no result file"
+        )
+    
+    try:
+        return await stream_saved_export(job_files(), ObjectId(job.result_file_id))
+    except NoFile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job result has expired"
+        )
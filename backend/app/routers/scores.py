@@ -0,0 +1,167 @@
+from fastapi import APIRouter, Body, Depends, status, Query, Response
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.models.score import ScoreCreate, ScoreUpdate, ScoreResponse, ScoreBatchResult, ScoreStats, ScoreStatsGroupBy, ScoreType
+from app.controllers.score_controller import (
+    check_score_access,
+    create_score,
+    create_scores_batch,
+    get_scores,
+    export_scores,
+    get_score_stats,
+    get_score_by_id,
+    update_score,
+    delete_score
+)
+from app.models.score_summary import StudentScoreSummaryResponse
+from app.services.score_summary_service import get_student_summary
+from app.services.job_runner import JOB_MAX_PRIORITY, JOB_MIN_PRIORITY, job_response
+from app.config.auth import get_current_user, TokenData
+from app.utils.responses import APIResponse
+from app.utils.consistency import causal_session, read_causal_token, set_causal_token
+
+router = APIRouter()
+
+@router.post("/", response_model=ScoreResponse, status_code=status.HTTP_201_CREATED)
+async def create_score_endpoint(
+    score_data: ScoreCreate,
+    response: Response,
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    Record a new score
+    """
+    async with causal_session() as session:
+        score = await create_score(score_data, current_user, session)
+        set_causal_token(response, session)
+    return score
+
+@router.post("/batch", response_model=ScoreBatchResult)
+async def create_scores_batch_endpoint(
+    response: Response,
+    scores: List[Dict[str, Any]] = Body(..., description="Rows shaped like ScoreCreate"),
+    ordered: bool = Query(True, description="Stop at the first failing row; false maximizes throughput"),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    Record a whole batch of scores, reporting errors per row
+    """
+    async with causal_session() as session:
+        result = await create_scores_batch(scores, ordered, current_user, session)
+        set_causal_token(response, session)
+    return result
+
+@router.get("/", response_model=List[ScoreResponse])
+async def read_scores(
+    skip: int = 0,
+    limit: int = 100,
+    student_id: Optional[str] = Query(None, description="Filter by student ID"),
+    subject: Optional[str] = Query(None, description="Filter by subject"),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    Get scores with pagination and optional filtering
+    """
+    return APIResponse(await get_scores(skip, limit, student_id, subject, current_user))
+
+@router.get("/export")
+async def export_scores_endpoint(
+    format: str = Query("ndjson", description="ndjson or csv"),
+    batch_size: int = Query(500, ge=1, le=10000, description="Rows fetched and written per chunk"),
+    institution_id: Optional[str] = Query(None, description="Filter by institution ID"),
+    student_id: Optional[str] = Query(None, description="Filter by student ID"),
+    start: Optional[datetime] = Query(None, description="Score date at or after"),
+    end: Optional[datetime] = Query(None, description="Score date before"),
+    background: bool = Query(False, description="Run as a background job and return its status"),
+    priority: int = Query(0, ge=JOB_MIN_PRIORITY, le=JOB_MAX_PRIORITY, description="Background job priority, higher runs first"),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    Stream all matching scores as NDJSON or CSV, or export them in a background job
+    """
+    export = await export_scores(format, batch_size, institution_id, student_id, start, end, current_user, background, priority)
+    if background:
+        return APIResponse(job_response(export), status_code=status.HTTP_202_ACCEPTED)
+    return export
+
+@router.get("/stats", response_model=ScoreStats)
+async def read_score_stats(
+    group_by: ScoreStatsGroupBy = Query(ScoreStatsGroupBy.SUBJECT, description="Dimension to group by"),
+    subject: Optional[str] = Query(None, description="Filter by subject"),
+    score_type: Optional[ScoreType] = Query(None, description="Filter by score type"),
+    student_id: Optional[str] = Query(None, description="Filter by student ID"),
+    institution_id: Optional[str] = Query(None, description="Filter by institution ID"),
+    start: Optional[datetime] = Query(None, description="Score date at or after"),
+    end: Optional[datetime] = Query(None, description="Score date before"),
+    bins: int = Query(10, ge=1, le=100, description="Histogram buckets over the normalized score"),
+    causal_token: Optional[str] = Depends(read_causal_token),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    Get mean, median, percentiles and histograms of normalized scores per group
+    """
+    # Refused before opening a session, which waits for a server
+    check_score_access(current_user)
+    async with causal_session(causal_token) as session:
+        return await get_score_stats(
+            group_by,
+            subject,
+            score_type.value if score_type else None,
+            student_id,
+            institution_id,
+            start,
+            end,
+            bins,
+            session
+        )
+
+@router.get("/summary/{student_id}", response_model=StudentScoreSummaryResponse)
+async def read_student_summary(
+    student_id: str,
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    Get a student's running averages per subject
+    """
+    check_score_access(current_user)
+    return await get_student_summary(student_id)
+
+@router.get("/{score_id}", response_model=ScoreResponse)
+async def read_score(
+    score_id: str,
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    Get a score by ID
+    """
+    return await get_score_by_id(score_id, current_user)
+
+@router.put("/{score_id}", response_model=ScoreResponse)
+async def update_score_endpoint(
+    score_id: str,
+    score_data: ScoreUpdate,
+    response: Response,
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    Update a score
+    """
+    async with causal_session() as session:
+        score = await update_score(score_id, score_data, current_user, session)
+        set_causal_token(response, session)
+    return score
+
+@router.delete("/{score_id}", response_model=dict)
+async def delete_score_endpoint(
+    score_id: str,
+    response: Response,
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    Delete a score
+    """
+    async with causal_session() as session:
+        result = await delete_score(score_id, current_user, session)
+        set_causal_token(response, session)
+    return result
@@ -1,63 +1,122 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query, Response
+from datetime import datetime
 from typing import List, Optional
 
 from app.models.student import StudentCreate, StudentUpdate, StudentResponse
 from app.controllers.student_controller import (
     create_student,
     get_students,
+    export_students,
     get_student_by_id,
     update_student,
     delete_student
 )
 from app.config.auth import get_current_user, TokenData
+from app.utils.pagination import next_cursor_headers, resolve_sort_key
+from app.utils.responses import APIResponse
+from app.utils.http_cache import document_etag, etag_matches, not_modified, set_cache_headers
+from app.services.job_runner import JOB_MAX_PRIORITY, JOB_MIN_PRIORITY, job_response
+from app.utils.consistency import causal_session, causal_token_headers, read_causal_token, set_causal_token
 
 router = APIRouter()
 
 @router.post("/", response_model=StudentResponse, status_code=status.HTTP_201_CREATED)
 async def create_student_endpoint(
     student_data: StudentCreate,
+    response: Response,
     current_user: TokenData = Depends(get_current_user)
 ):
     """
     Create a new student
     """
-    return await create_student(student_data, current_user)
+    async with causal_session() as session:
+        student = await create_student(student_data, current_user, session)
+        set_causal_token(response, session)
+    return student
 
 @router.get("/", response_model=List[StudentResponse])
 async def read_students(
     skip: int = 0, 
     limit: int = 100,
-    institution_id: Optional[str] = Query(None, description="Filter by institution ID")
+    institution_id: Optional[str] = Query(None, description="Filter by institution ID"),
+    after: Optional[str] = Query(None, description="Cursor from X-Next-Cursor; replaces skip"),
+    sort_by: Optional[str] = Query(None, description="Sort key: _id, institution_id or created_at"),
+    fields: Optional[str] = Query(None, description="Comma separated sparse fieldset"),
+    causal_token: Optional[str] = Depends(read_causal_token)
 ):
     """
     Get all students with pagination and optional filtering by institution
     """
-    return await get_students(skip, limit, institution_id)
+    sort_key = resolve_sort_key(sort_by, after)
+    async with causal_session(causal_token) as session:
+        students = await get_students(skip, limit, institution_id, after, sort_key, fields, session)
+    
+    return APIResponse(
+        students,
+        headers={**next_cursor_headers(students, limit, sort_key), **causal_token_headers(session)}
+    )
+
+@router.get("/export")
+async def export_students_endpoint(
+    format: str = Query("ndjson", description="ndjson or csv"),
+    batch_size: int = Query(500, ge=1, le=10000, description="Rows fetched and written per chunk"),
+    institution_id: Optional[str] = Query(None, description="Filter by institution ID"),
+    start: Optional[datetime] = Query(None, description="Created at or after"),
+    end: Optional[datetime] = Query(None, description="Created before"),
+    background: bool = Query(False, description="Run as a background job and return its status"),
+    priority: int = Query(0, ge=JOB_MIN_PRIORITY, le=JOB_MAX_PRIORITY, description="Background job priority, higher runs first"),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    Stream all matching students as NDJSON or CSV, or export them in a background job
+    """
+    export = await export_students(format, batch_size, institution_id, start, end, current_user, background, priority)
+    if background:
+        return APIResponse(job_response(export), status_code=status.HTTP_202_ACCEPTED)
+    return export
 
 @router.get("/{student_id}", response_model=StudentResponse)
-async def read_student(student_id: str):
+async def read_student(
+    student_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None)
+):
     """
-    Get a student by ID
+    Get a student by ID, answering 304 when the client's copy is current
     """
-    return await get_student_by_id(student_id)
+    student = await get_student_by_id(student_id)
+    
+    etag = document_etag(student)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, "student")
+    set_cache_headers(response, etag, "student")
+    return student
 
 @router.put("/{student_id}", response_model=StudentResponse)
 async def update_student_endpoint(
     student_id: str,
     student_data: StudentUpdate,
+    response: Response,
     current_user: TokenData = Depends(get_current_user)
 ):
     """
     Update a student
     """
-    return await update_student(student_id, student_data, current_user)
+    async with causal_session() as session:
+        student = await update_student(student_id, student_data, current_user, session)
+        set_causal_token(response, session)
+    return student
 
 @router.delete("/{student_id}", response_model=dict)
 async def delete_student_endpoint(
     student_id: str,
+    response: Response,
     current_user: TokenData = Depends(get_current_user)
 ):
     """
     Delete a student
     """
-    return await delete_student(student_id, current_user)
\ No newline at end of file
+    async with causal_session() as session:
+        result = await delete_student(student_id, current_user, session)
+        set_causal_token(response, session)
+    return result
\ No newline at end of file
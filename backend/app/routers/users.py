@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import List, Optional
 
 from app.models.user import UserUpdate, UserResponse
 from app.controllers.user_controller import get_users, get_user_by_id, update_user, delete_user
 from app.config.auth import get_current_user, TokenData
+from app.utils.pagination import next_cursor_headers, resolve_sort_key
+from app.utils.responses import APIResponse
 
 router = APIRouter()
 
@@ -11,12 +13,18 @@ router = APIRouter()
 async def read_users(
     skip: int = 0, 
     limit: int = 100,
+    after: Optional[str] = Query(None, description="Cursor from X-Next-Cursor; replaces skip"),
+    sort_by: Optional[str] = Query(None, description="Sort key: _id, institution_id or created_at"),
+    fields: Optional[str] = Query(None, description="Comma separated sparse fieldset"),
     current_user: TokenData = Depends(get_current_user)
 ):
     """
     Get all users with pagination
     """
-    return await get_users(skip, limit, current_user)
+    sort_key = resolve_sort_key(sort_by, after)
+    users = await get_users(skip, limit, current_user, after, sort_key, fields)
+    
+    return APIResponse(users, headers=next_cursor_headers(users, limit, sort_key))
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def read_user(
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import logging
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from app.models.ai_cache import AIResponseCache
+from app.utils.cache import LRUCache
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+AI_CACHE_MEMORY_SIZE = int(os.getenv("AI_CACHE_MEMORY_SIZE", 512))
+AI_CACHE_TTL_SECONDS = int(os.getenv("AI_CACHE_TTL_SECONDS", 86400))
+AI_CACHE_MONGO_ENABLED = os.getenv("AI_CACHE_MONGO_ENABLED", "true").lower() == "true"
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip().lower()
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    return value
+
+def cache_key(kind: str, params: Dict[str, Any], model: str, temperature: float) -> str:
+    """
+    Content address of an AI request: case and whitespace insensitive inputs plus model settings
+    """
+    payload = {
+        "kind": kind,
+        "params": _normalize(params),
+        "model": model,
+        "temperature": temperature
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+class MemoryCacheBackend:
+    """
+    Process-local LRU tier
+    """
+    name = "memory"
+    
+    def __init__(self, max_size: int, ttl: int):
+        self._cache = LRUCache(max_size=max_size, ttl=ttl)
+    
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._cache.get(key)
+    
+    async def set(self, key: str, kind: str, value: Dict[str, Any], ttl: int):
+        self._cache.set(key, value, ttl=ttl)
+
+class MongoCacheBackend:
+    """
+    Shared tier in the ai_response_cache collection, expired by a TTL index
+    """
+    name = "mongo"
+    
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = await AIResponseCache.get_motor_collection().find_one(
+            {"key": key, "expires_at": {"$gt": datetime.utcnow()}},
+            {"response": 1}
+        )
+        return entry["response"] if entry else None
+    
+    async def set(self, key: str, kind: str, value: Dict[str, Any], ttl: int):
+        now = datetime.utcnow()
+        await AIResponseCache.get_motor_collection().update_one(
+            {"key": key},
+            {"$set": {
+                "kind": kind,
+                "response": value,
+                "created_at": now,
+                "expires_at": now + timedelta(seconds=ttl)
+            }},
+            upsert=True
+        )
+
+class TieredCache:
+    """
+    Read-through chain of cache backends; hits in slower tiers fill the faster ones
+    """
+    
+    def __init__(self, backends: List[Any], ttl: int):
+        self.backends = backends
+        self.ttl = ttl
+        self.lookups = 0
+        self.misses = 0
+        self.hits = {backend.name: 0 for backend in backends}
+    
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        self.lookups += 1
+        
+        for position, backend in enumerate(self.backends):
+            try:
+                value = await backend.get(key)
+            except Exception:
+                # A broken tier must never fail the request
+                logger.warning("AI cache tier %s lookup failed", backend.name, exc_info=True)
+                continue
+            
+            if value is not None:
+                self.hits[backend.name] += 1
+                for faster in self.backends[:position]:
+                    await faster.set(key, "", value, self.ttl)
+                return value
+        
+        self.misses += 1
+        return None
+    
+    async def set(self, key: str, kind: str, value: Dict[str, Any]):
+        for backend in self.backends:
+            try:
+                await backend.set(key, kind, value, self.ttl)
+            except Exception:
+                logger.warning("AI cache tier %s write failed", backend.name, exc_info=True)
+    
+    def stats(self) -> Dict[str, Any]:
+        hits = sum(self.hits.values())
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": hits / self.lookups if self.lookups else 0.0
+        }
+
+def _default_backends() -> List[Any]:
+    backends: List[Any] = [MemoryCacheBackend(AI_CACHE_MEMORY_SIZE, AI_CACHE_TTL_SECONDS)]
+    if AI_CACHE_MONGO_ENABLED:
+        backends.append(MongoCacheBackend())
+    return backends
+
+# Shared cache for AI generation responses
+ai_cache = TieredCache(_default_backends(), AI_CACHE_TTL_SECONDS)
@@ -0,0 +1,279 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+from openai import APIConnectionError, APIStatusError, APITimeoutError, AsyncOpenAI
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Upstream client configuration
+AI_REQUEST_TIMEOUT = float(os.getenv("AI_REQUEST_TIMEOUT", 60))
+AI_CONNECT_TIMEOUT = float(os.getenv("AI_CONNECT_TIMEOUT", 5))
+AI_MAX_CONNECTIONS = int(os.getenv("AI_MAX_CONNECTIONS", 20))
+AI_MAX_RETRIES = int(os.getenv("AI_MAX_RETRIES", 3))
+AI_RETRY_BASE_DELAY = float(os.getenv("AI_RETRY_BASE_DELAY", 0.5))
+AI_RETRY_MAX_DELAY = float(os.getenv("AI_RETRY_MAX_DELAY", 8))
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", 16))
+AI_MAX_CONCURRENCY_PER_USER = int(os.getenv("AI_MAX_CONCURRENCY_PER_USER", 2))
+AI_QUEUE_TIMEOUT = float(os.getenv("AI_QUEUE_TIMEOUT", 10))
+AI_BREAKER_FAILURE_THRESHOLD = int(os.getenv("AI_BREAKER_FAILURE_THRESHOLD", 5))
+AI_BREAKER_RESET_SECONDS = float(os.getenv("AI_BREAKER_RESET_SECONDS", 30))
+
+def _retryable(error: Exception) -> bool:
+    if isinstance(error, (APITimeoutError, APIConnectionError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+def _unavailable(detail: str, retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=detail,
+        headers={"Retry-After": str(max(1, round(retry_after)))},
+    )
+
+class CircuitBreaker:
+    """
+    Fail fast after consecutive upstream failures.
+    
+    After the threshold is reached the circuit opens for the reset period,
+    then a single trial call is let through; its outcome closes the circuit
+    or opens it again.
+    """
+    
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+    
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+    
+    def before_call(self):
+        state = self.state
+        if state == "open" or (state == "half_open" and self.trial_in_flight):
+            retry_after = self.reset_seconds - (time.monotonic() - self.opened_at)
+            raise _unavailable("AI service is temporarily unavailable, please retry", retry_after)
+        if state == "half_open":
+            self.trial_in_flight = True
+    
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+    
+    def record_failure(self):
+        self.failures += 1
+        if self.trial_in_flight or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning("AI circuit breaker opened after %d failures", self.failures)
+            self.opened_at = time.monotonic()
+        self.trial_in_flight = False
+    
+    def record_abandoned(self):
+        # A cancelled trial says nothing about the upstream; let the next call try again
+        self.trial_in_flight = False
+
+class AIClient:
+    """
+    Shared OpenAI client with a pooled keep-alive connection, per-call
+    timeouts, retries with jittered exponential backoff on 429/5xx, global
+    and per-user concurrency limits and a circuit breaker.
+    """
+    
+    def __init__(self, api_key: Optional[str] = None):
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=AI_MAX_CONNECTIONS,
+                max_keepalive_connections=AI_MAX_CONNECTIONS
+            ),
+            timeout=httpx.Timeout(AI_REQUEST_TIMEOUT, connect=AI_CONNECT_TIMEOUT)
+        )
+        # Retries are handled here so they also cover the circuit breaker
+        self._openai = AsyncOpenAI(
+            # A missing key surfaces as an authentication error on the first call
+            api_key=api_key or os.getenv("OPENAI_API_KEY", ""),
+            http_client=self._http,
+            max_retries=0
+        )
+        self._slots = asyncio.Semaphore(AI_MAX_CONCURRENCY)
+        self._user_calls: Dict[str, int] = {}
+        self.breaker = CircuitBreaker(AI_BREAKER_FAILURE_THRESHOLD, AI_BREAKER_RESET_SECONDS)
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.rejected = 0
+    
+    @asynccontextmanager
+    async def user_slot(self, user_id: Optional[str]):
+        """
+        Count a caller against its per-user limit for the duration of the block.
+        
+        Callers over their own limit are turned away with a 429 instead of queueing.
+        """
+        if user_id is None:
+            yield
+            return
+        
+        if self._user_calls.get(user_id, 0) >= AI_MAX_CONCURRENCY_PER_USER:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many concurrent AI requests",
+                headers={"Retry-After": "1"},
+            )
+        
+        self._user_calls[user_id] = self._user_calls.get(user_id, 0) + 1
+        try:
+            yield
+        finally:
+            self._user_calls[user_id] -= 1
+            if not self._user_calls[user_id]:
+                del self._user_calls[user_id]
+    
+    @asynccontextmanager
+    async def _slot(self):
+        # Upstream calls wait a bounded time for one of the global slots
+        try:
+            await asyncio.wait_for(self._slots.acquire(), AI_QUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise _unavailable("AI service is busy, please retry", 1)
+        try:
+            yield
+        finally:
+            self._slots.release()
+    
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter keeps retrying callers from synchronizing
+        return random.uniform(0, min(AI_RETRY_MAX_DELAY, AI_RETRY_BASE_DELAY * 2 ** attempt))
+    
+    async def _create(self, **kwargs) -> Any:
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            self.calls += 1
+            try:
+                response = await self._openai.chat.completions.create(**kwargs)
+            except Exception as e:
+                if not _retryable(e):
+                    # The upstream answered, so it is healthy
+                    self.breaker.record_success()
+                    raise
+                self.failures += 1
+                self.breaker.record_failure()
+                if attempt >= AI_MAX_RETRIES:
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+                attempt += 1
+                self.retries += 1
+                continue
+            except BaseException:
+                # Cancelled mid-call; a half-open trial must not stay in flight forever
+                self.breaker.record_abandoned()
+                raise
+            
+            self.breaker.record_success()
+            return response
+    
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        max_tokens: int,
+        temperature: float,
+        user_id: Optional[str] = None
+    ) -> str:
+        """
+        Run a chat completion and return the generated text.
+        Pass user_id to count the call against that user's limit.
+        """
+        async with self.user_slot(user_id), self._slot():
+            response = await self._create(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature
+            )
+        return response.choices[0].message.content or ""
+    
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        max_tokens: int,
+        temperature: float,
+        user_id: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Run a chat completion, yielding text deltas as they arrive.
+        Only opening the stream is retried; a stream failing midway raises.
+        """
+        async with self.user_slot(user_id), self._slot():
+            response = await self._create(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stream=True
+            )
+            try:
+                async for chunk in response:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                # Release the pooled connection even when the consumer stops early
+                await response.response.aclose()
+    
+    async def close(self):
+        await self._http.aclose()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "active_users": len(self._user_calls),
+            "circuit": self.breaker.state
+        }
+
+_ai_client: Optional[AIClient] = None
+
+def get_ai_client() -> AIClient:
+    """
+    Get the shared AI client, creating it on first use
+    """
+    global _ai_client
+    
+    if _ai_client is None:
+        _ai_client = AIClient()
+    return _ai_client
+
+async def close_ai_client():
+    """
+    Close the shared AI client and its connection pool
+    """
+    global _ai_client
+    
+    if _ai_client is not None:
+        await _ai_client.close()
+        _ai_client = None
@@ -1,20 +1,58 @@
 import os
-from typing import List, Dict, Any, Optional
-import openai
+from typing import List, Dict, Any, AsyncIterator, Optional
 from dotenv import load_dotenv
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from app.services.ai_client import get_ai_client
+from app.services.ai_cache import ai_cache, cache_key
+from app.utils.singleflight import SingleFlight
+from app.utils.sse import sse_event
+from app.utils.stats import describe, outlier_indexes
+from app.utils.tokens import count_tokens, truncate_to_tokens
 
 # Load environment variables
 load_dotenv()
 
 # Configure OpenAI API
-openai.api_key = os.getenv("OPENAI_API_KEY")
+AI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+AI_TEMPERATURE = float(os.getenv("OPENAI_TEMPERATURE", 0.7))
+
+# Prompt size limits for performance analysis
+AI_PROMPT_TOKEN_BUDGET = int(os.getenv("AI_PROMPT_TOKEN_BUDGET", 1500))
+AI_PROMPT_MAX_OUTLIERS = int(os.getenv("AI_PROMPT_MAX_OUTLIERS", 20))
+
+# Identical concurrent requests share one upstream call
+ai_requests_in_flight = SingleFlight()
 
-async def generate_lesson_plan(subject: str, grade: str, topic: str, duration: int) -> Dict[str, Any]:
+class Generation(BaseModel):
     """
-    Generate a lesson plan using OpenAI API
+    A prepared AI generation: the prompt plus how to shape and cache its result
     """
-    try:
-        prompt = f"""Create a detailed lesson plan for a {duration}-minute class on {topic} for {grade} grade {subject} students.
+    kind: str
+    params: Dict[str, Any]
+    system_prompt: str
+    prompt: str
+    max_tokens: int
+    result_field: str
+    result_extra: Dict[str, Any]
+    cacheable: bool = False
+    
+    @property
+    def key(self) -> str:
+        return cache_key(self.kind, self.params, AI_MODEL, AI_TEMPERATURE)
+    
+    def messages(self) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": self.prompt}
+        ]
+    
+    def result(self, content: str) -> Dict[str, Any]:
+        return {self.result_field: content, **self.result_extra}
+
+def lesson_plan_generation(subject: str, grade: str, topic: str, duration: int) -> Generation:
+    prompt = f"""Create a detailed lesson plan for a {duration}-minute class on {topic} for {grade} grade {subject} students.
         Include the following sections:
         1. Learning Objectives
         2. Materials Needed
@@ -26,33 +64,21 @@ async def generate_lesson_plan(subject: str, grade: str, topic: str, duration: i
         
         Make the lesson engaging, interactive, and aligned with educational standards.
         """
-        
-        response = await openai.ChatCompletion.acreate(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are an expert educational consultant specializing in curriculum development."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=1500,
-            temperature=0.7
-        )
-        
-        return {
-            "lesson_plan": response.choices[0].message.content,
-            "subject": subject,
-            "grade": grade,
-            "topic": topic,
-            "duration": duration
-        }
-    except Exception as e:
-        return {"error": str(e)}
+    params = {"subject": subject, "grade": grade, "topic": topic, "duration": duration}
+    
+    return Generation(
+        kind="lesson_plan",
+        params=params,
+        system_prompt="You are an expert educational consultant specializing in curriculum development.",
+        prompt=prompt,
+        max_tokens=1500,
+        result_field="lesson_plan",
+        result_extra=params,
+        cacheable=True
+    )
 
-async def generate_quiz_questions(subject: str, grade: str, topic: str, num_questions: int) -> Dict[str, Any]:
-    """
-    Generate quiz questions using OpenAI API
-    """
-    try:
-        prompt = f"""Create {num_questions} quiz questions for {grade} grade {subject} students on the topic of {topic}.
+def quiz_generation(subject: str, grade: str, topic: str, num_questions: int) -> Generation:
+    prompt = f"""Create {num_questions} quiz questions for {grade} grade {subject} students on the topic of {topic}.
         For each question, provide:
         1. The question
         2. Four multiple-choice options (A, B, C, D)
@@ -61,73 +87,207 @@ async def generate_quiz_questions(subject: str, grade: str, topic: str, num_ques
         
         Make the questions varied in difficulty and aligned with educational standards.
         """
-        
-        response = await openai.ChatCompletion.acreate(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are an expert educational assessment specialist."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=1500,
-            temperature=0.7
+    params = {"subject": subject, "grade": grade, "topic": topic, "num_questions": num_questions}
+    
+    return Generation(
+        kind="quiz",
+        params=params,
+        system_prompt="You are an expert educational assessment specialist.",
+        prompt=prompt,
+        max_tokens=1500,
+        result_field="quiz_questions",
+        result_extra=params,
+        cacheable=True
+    )
+
+def summarize_scores(scores: List[Dict[str, Any]], bins: int = 10) -> Dict[str, Any]:
+    """
+    Compute per assessment type statistics of raw scores, shaped like the score stats API
+    """
+    by_type: Dict[str, List[float]] = {}
+    for score in scores:
+        if score["max_value"] > 0:
+            by_type.setdefault(score["assessment_type"], []).append(score["value"] / score["max_value"])
+    
+    return {
+        "group_by": "score_type",
+        "bins": bins,
+        "groups": [
+            {"key": assessment_type, **describe(values, bins)}
+            for assessment_type, values in sorted(by_type.items())
+        ]
+    }
+
+def format_score_stats(stats: Dict[str, Any], detailed: bool = True) -> str:
+    """
+    Render score statistics as compact prompt text, in percent of the maximum score.
+    Without detail only the central tendency and range of each group is kept.
+    """
+    lines = []
+    for group in stats["groups"]:
+        line = (
+            f"{group['key'] or 'all'}: {group['count']} scores, mean {group['mean']:.0%}, "
+            f"median {group['median']:.0%}, std dev {group['std_dev']:.0%}, "
+            f"range {group['min']:.0%}-{group['max']:.0%}"
         )
-        
-        return {
-            "quiz_questions": response.choices[0].message.content,
-            "subject": subject,
-            "grade": grade,
-            "topic": topic,
-            "num_questions": num_questions
-        }
-    except Exception as e:
-        return {"error": str(e)}
+        if detailed:
+            percentiles = ", ".join(f"{name} {value:.0%}" for name, value in group["percentiles"].items())
+            line += f", percentiles {percentiles}, histogram {group['histogram']}"
+        lines.append(line)
+    return "\n".join(lines)
 
-async def analyze_student_performance(scores: List[Dict[str, Any]], subject: str) -> Dict[str, Any]:
+def score_outliers(scores: List[Dict[str, Any]], stats: Dict[str, Any]) -> List[str]:
     """
-    Analyze student performance data using OpenAI API
+    Describe the scores outside their assessment type's typical range, most extreme first
     """
-    try:
-        # Format scores data for the prompt
-        scores_text = "\n".join([f"Student {i+1}: {score['value']}/{score['max_value']} on {score['assessment_type']}" 
-                              for i, score in enumerate(scores)])
-        
-        prompt = f"""Analyze the following student performance data for {subject}:
-        
-        {scores_text}
+    quartiles = {
+        group["key"]: (group["percentiles"]["p25"], group["percentiles"]["p75"])
+        for group in stats["groups"]
+        if group.get("percentiles")
+    }
+    
+    candidates = [
+        (i, score, score["value"] / score["max_value"])
+        for i, score in enumerate(scores)
+        if score["max_value"] > 0 and score["assessment_type"] in quartiles
+    ]
+    
+    # Split by type in one pass; scanning all scores per type is quadratic
+    members_by_type: Dict[str, List[int]] = {}
+    for position, (_, score, _) in enumerate(candidates):
+        members_by_type.setdefault(score["assessment_type"], []).append(position)
+    
+    # Fences are per type, so rank each type's outliers by their own spread
+    ranked = []
+    for assessment_type, (q1, q3) in quartiles.items():
+        members = members_by_type.get(assessment_type, [])
+        for position in outlier_indexes([candidates[member][2] for member in members], q1, q3):
+            i, score, value = candidates[members[position]]
+            distance = (q1 - value) if value < q1 else (value - q3)
+            ranked.append((distance / max(q3 - q1, 0.01), i, score, value, value < q1))
+    ranked.sort(key=lambda entry: entry[0], reverse=True)
+    
+    return [
+        f"Student {i+1}: {score['value']}/{score['max_value']} ({value:.0%}) on {score['assessment_type']}, "
+        f"{'below' if low else 'above'} the typical range"
+        for _, i, score, value, low in ranked
+    ]
+
+def _performance_prompt(subject: str, stats_text: str, outliers: List[str]) -> str:
+    outliers_section = ""
+    if outliers:
+        outliers_text = "\n        ".join(outliers)
+        outliers_section = f"""
+        Outlying individual scores, most extreme first:
+        {outliers_text}
+        """
+    
+    return f"""Analyze the following student performance data for {subject}.
         
+        Precomputed statistics per assessment type (percent of maximum score):
+        {stats_text}
+        {outliers_section}
         Please provide:
-        1. Statistical analysis (average, median, range)
+        1. Interpretation of the statistics above
         2. Strengths and weaknesses identified
         3. Recommendations for improvement
         4. Suggested differentiation strategies for struggling and advanced students
         """
-        
-        response = await openai.ChatCompletion.acreate(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are an expert educational data analyst specializing in student performance."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=1500,
-            temperature=0.7
-        )
-        
-        return {
-            "analysis": response.choices[0].message.content,
-            "subject": subject,
-            "num_scores_analyzed": len(scores)
-        }
-    except Exception as e:
-        return {"error": str(e)}
 
-async def generate_feedback(student_name: str, subject: str, performance: str, areas_to_improve: List[str]) -> Dict[str, Any]:
+def _pooled_summary(groups: List[Dict[str, Any]]) -> str:
+    # One line standing in for groups left out of the prompt
+    count = sum(group["count"] for group in groups)
+    mean = sum(group["mean"] * group["count"] for group in groups) / count
+    return (
+        f"{len(groups)} other assessment types: {count} scores, mean {mean:.0%}, "
+        f"range {min(group['min'] for group in groups):.0%}-{max(group['max'] for group in groups):.0%}"
+    )
+
+def _largest_groups_text(subject: str, stats: Dict[str, Any], budget: int) -> str:
     """
-    Generate personalized student feedback using OpenAI API
+    Brief statistics of as many of the largest groups as fit the budget, with the
+    rest pooled into one summary line
     """
-    try:
-        areas_text = "\n".join([f"- {area}" for area in areas_to_improve])
-        
-        prompt = f"""Generate personalized feedback for a student named {student_name} in {subject} class.
+    groups = sorted(stats["groups"], key=lambda group: group["count"], reverse=True)
+    
+    def stats_text(kept: int) -> str:
+        lines = [format_score_stats({"groups": groups[:kept]}, detailed=False)] if kept else []
+        return "\n".join(lines + [_pooled_summary(groups[kept:])])
+    
+    # The prompt grows with every group kept, so search for the most that fit
+    low, high = 0, len(groups) - 1
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(_performance_prompt(subject, stats_text(middle), []), AI_MODEL) <= budget:
+            low = middle
+        else:
+            high = middle - 1
+    
+    # Only a summary line longer than the whole budget is cut, never the instructions
+    spare = budget - count_tokens(_performance_prompt(subject, "", []), AI_MODEL)
+    return truncate_to_tokens(stats_text(low), max(spare, 0), AI_MODEL)
+
+def compact_performance_prompt(scores: List[Dict[str, Any]], subject: str, stats: Dict[str, Any]) -> str:
+    """
+    Build the analysis prompt from distribution summaries plus as many outliers
+    as fit the token budget, so its size does not grow with the number of scores.
+    When there are too many groups, the largest are kept and the rest summarized.
+    """
+    budget = AI_PROMPT_TOKEN_BUDGET
+    stats_text = format_score_stats(stats)
+    prompt = _performance_prompt(subject, stats_text, [])
+    
+    if count_tokens(prompt, AI_MODEL) > budget:
+        stats_text = format_score_stats(stats, detailed=False)
+        prompt = _performance_prompt(subject, stats_text, [])
+    if count_tokens(prompt, AI_MODEL) > budget:
+        stats_text = _largest_groups_text(subject, stats, budget)
+        prompt = _performance_prompt(subject, stats_text, [])
+    used = count_tokens(prompt, AI_MODEL)
+    
+    outliers = []
+    # Reserve room for the section heading
+    used += count_tokens("Outlying individual scores, most extreme first:", AI_MODEL) + 2
+    for line in score_outliers(scores, stats)[:AI_PROMPT_MAX_OUTLIERS]:
+        cost = count_tokens(line, AI_MODEL) + 1
+        if used + cost > budget:
+            break
+        outliers.append(line)
+        used += cost
+    
+    return _performance_prompt(subject, stats_text, outliers)
+
+def performance_analysis_generation(
+    scores: List[Dict[str, Any]],
+    subject: str,
+    stats: Optional[Dict[str, Any]] = None
+) -> Generation:
+    """
+    Statistics are computed before prompting, from the raw scores or by the
+    score stats aggregation when stats are passed in, so the model only
+    interprets them. Individual scores only appear as outliers.
+    """
+    if stats is None:
+        stats = summarize_scores(scores)
+    
+    return Generation(
+        kind="performance_analysis",
+        params={"scores": scores, "subject": subject, "stats": stats},
+        system_prompt="You are an expert educational data analyst specializing in student performance.",
+        prompt=compact_performance_prompt(scores, subject, stats),
+        max_tokens=1500,
+        result_field="analysis",
+        result_extra={
+            "subject": subject,
+            "statistics": stats,
+            "num_scores_analyzed": len(scores) or sum(group["count"] for group in stats["groups"])
+        }
+    )
+
+def feedback_generation(student_name: str, subject: str, performance: str, areas_to_improve: List[str]) -> Generation:
+    areas_text = "\n".join([f"- {area}" for area in areas_to_improve])
+    
+    prompt = f"""Generate personalized feedback for a student named {student_name} in {subject} class.
         
         Overall performance: {performance}
         
@@ -143,21 +303,118 @@ async def generate_feedback(student_name: str, subject: str, performance: str, a
         
         Keep the tone positive, specific, and actionable. The feedback should be appropriate for sharing with both the student and their parents.
         """
-        
-        response = await openai.ChatCompletion.acreate(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are an experienced and empathetic teacher who provides constructive feedback."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=1000,
-            temperature=0.7
+    
+    return Generation(
+        kind="feedback",
+        params={"student_name": student_name, "subject": subject, "performance": performance, "areas_to_improve": areas_to_improve},
+        system_prompt="You are an experienced and empathetic teacher who provides constructive feedback.",
+        prompt=prompt,
+        max_tokens=1000,
+        result_field="feedback",
+        result_extra={"student_name": student_name, "subject": subject}
+    )
+
+async def run_generation(generation: Generation, use_cache: bool = True, user_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run a generation, served from the response cache when possible and coalesced with identical in-flight calls
+    """
+    key = generation.key
+    if generation.cacheable and use_cache:
+        cached = await ai_cache.get(key)
+        if cached is not None:
+            return cached
+    
+    # Every caller is held to its own limit; the shared upstream call only takes a global slot
+    async with get_ai_client().user_slot(user_id):
+        return await ai_requests_in_flight.do(key, lambda: _request_generation(generation, key))
+
+async def _request_generation(generation: Generation, key: str) -> Dict[str, Any]:
+    try:
+        content = await get_ai_client().complete(
+            generation.messages(),
+            model=AI_MODEL,
+            max_tokens=generation.max_tokens,
+            temperature=AI_TEMPERATURE
         )
         
-        return {
-            "feedback": response.choices[0].message.content,
-            "student_name": student_name,
-            "subject": subject
-        }
+        result = generation.result(content)
+    except HTTPException:
+        # Overload and circuit breaker rejections keep their status code
+        raise
     except Exception as e:
-        return {"error": str(e)}
\ No newline at end of file
+        return {"error": str(e)}
+    
+    if generation.cacheable:
+        await ai_cache.set(key, generation.kind, result)
+    return result
+
+async def stream_generation(
+    generation: Generation,
+    use_cache: bool = True,
+    user_id: Optional[str] = None
+) -> AsyncIterator[str]:
+    """
+    Run a generation as Server-Sent Events: one delta event per token chunk,
+    then a done event carrying the same payload as the non-streaming call.
+    The completed output is cached like a regular response.
+    """
+    key = generation.key
+    if generation.cacheable and use_cache:
+        cached = await ai_cache.get(key)
+        if cached is not None:
+            yield sse_event("delta", {"content": cached[generation.result_field]})
+            yield sse_event("done", cached)
+            return
+    
+    parts = []
+    try:
+        deltas = get_ai_client().stream(
+            generation.messages(),
+            model=AI_MODEL,
+            max_tokens=generation.max_tokens,
+            temperature=AI_TEMPERATURE,
+            user_id=user_id
+        )
+        async for delta in deltas:
+            parts.append(delta)
+            yield sse_event("delta", {"content": delta})
+    except HTTPException as e:
+        # Headers are already sent, so rejections are reported in-stream
+        yield sse_event("error", {"error": e.detail, "status_code": e.status_code})
+        return
+    except Exception as e:
+        yield sse_event("error", {"error": str(e)})
+        return
+    
+    result = generation.result("".join(parts))
+    if generation.cacheable:
+        await ai_cache.set(key, generation.kind, result)
+    yield sse_event("done", result)
+
+async def generate_lesson_plan(subject: str, grade: str, topic: str, duration: int, use_cache: bool = True) -> Dict[str, Any]:
+    """
+    Generate a lesson plan using OpenAI API, served from the response cache when possible
+    """
+    return await run_generation(lesson_plan_generation(subject, grade, topic, duration), use_cache)
+
+async def generate_quiz_questions(subject: str, grade: str, topic: str, num_questions: int, use_cache: bool = True) -> Dict[str, Any]:
+    """
+    Generate quiz questions using OpenAI API, served from the response cache when possible
+    """
+    return await run_generation(quiz_generation(subject, grade, topic, num_questions), use_cache)
+
+async def analyze_student_performance(
+    scores: List[Dict[str, Any]],
+    subject: str,
+    stats: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Analyze student performance data using OpenAI API
+    """
+    return await run_generation(performance_analysis_generation(scores, subject, stats))
+
+async def generate_feedback(student_name: str, subject: str, performance: str, areas_to_improve: List[str]) -> Dict[str, Any]:
+    """
+    Generate personalized student feedback using OpenAI API
+    """
+    return await run_generation(feedback_generation(student_name, subject, performance, areas_to_improve))
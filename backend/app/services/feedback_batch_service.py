@@ -0,0 +1,296 @@
+import asyncio
+import json
+import logging
+import math
+import os
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from bson import ObjectId
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+
+from app.config.auth import TokenData
+from app.models.feedback_batch import (
+    FeedbackBatch,
+    FeedbackBatchCreate,
+    FeedbackBatchResponse,
+    FeedbackBatchStatus,
+    FeedbackItem,
+    FeedbackItemStatus
+)
+from app.models.score_summary import StudentScoreSummary
+from app.models.student import Student
+from app.models.user import User
+from app.services.ai_service import generate_feedback
+from app.utils.projection import parse_object_id
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Feedback batch configuration
+FEEDBACK_BATCH_CONCURRENCY = int(os.getenv("FEEDBACK_BATCH_CONCURRENCY", 4))
+FEEDBACK_BATCH_MAX_STUDENTS = int(os.getenv("FEEDBACK_BATCH_MAX_STUDENTS", 200))
+# How often a stream rereads a batch that runs in another process
+FEEDBACK_BATCH_POLL_INTERVAL = float(os.getenv("FEEDBACK_BATCH_POLL_INTERVAL", 1))
+
+# Queues of clients streaming the results of batches run by this process
+_batch_subscribers: Dict[str, List[asyncio.Queue]] = {}
+
+def describe_performance(summary: Optional[StudentScoreSummary]) -> str:
+    """
+    Describe a student's subject summary in one line for the feedback prompt
+    """
+    if summary is None or not summary.value_count:
+        return "No recorded scores yet"
+    
+    mean = summary.value_sum / summary.value_count
+    std_dev = math.sqrt(max(summary.value_sum_sq / summary.value_count - mean * mean, 0.0))
+    text = (
+        f"Average {mean:.0%} over {summary.value_count} scores "
+        f"(range {summary.min_value:.0%}-{summary.max_value:.0%}, std dev {std_dev:.0%})"
+    )
+    
+    if summary.recent:
+        recent = ", ".join(f"{entry.value:.0%}" for entry in summary.recent)
+        text += f"; most recent first: {recent}"
+    return text
+
+async def _resolve_students(request: FeedbackBatchCreate) -> List[FeedbackItem]:
+    if request.students:
+        requested = {student.student_id: student for student in request.students}
+        object_ids = [parse_object_id(student_id, "Student not found") for student_id in requested]
+        students = await Student.get_motor_collection().find(
+            {"_id": {"$in": object_ids}},
+            {"user_id": 1}
+        ).to_list(length=None)
+        if len(students) != len(requested):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Student not found"
+            )
+    else:
+        query: Dict[str, Any] = {"institution_id": request.institution_id}
+        if request.grade:
+            query["grade"] = request.grade
+        requested = {}
+        # One extra row is enough to tell that the batch would be too large
+        students = await Student.get_motor_collection().find(
+            query,
+            {"user_id": 1}
+        ).sort("_id", 1).limit(FEEDBACK_BATCH_MAX_STUDENTS + 1).to_list(length=None)
+    
+    if not students:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No students found"
+        )
+    
+    if len(students) > FEEDBACK_BATCH_MAX_STUDENTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch can include at most {FEEDBACK_BATCH_MAX_STUDENTS} students"
+        )
+    
+    # One query each for names and summaries instead of one per student
+    user_ids = [ObjectId(student["user_id"]) for student in students if ObjectId.is_valid(student["user_id"])]
+    users = await User.get_motor_collection().find(
+        {"_id": {"$in": user_ids}},
+        {"first_name": 1, "last_name": 1}
+    ).to_list(length=None)
+    names = {str(user["_id"]): f"{user['first_name']} {user['last_name']}" for user in users}
+    
+    student_ids = [str(student["_id"]) for student in students]
+    summaries = await StudentScoreSummary.find(
+        {"student_id": {"$in": student_ids}, "subject": request.subject}
+    ).to_list()
+    summaries_by_student = {summary.student_id: summary for summary in summaries}
+    
+    items = []
+    for student in students:
+        student_id = str(student["_id"])
+        override = requested.get(student_id)
+        items.append(FeedbackItem(
+            student_id=student_id,
+            student_name=(override and override.student_name) or names.get(student["user_id"], "Student"),
+            performance=(override and override.performance) or describe_performance(summaries_by_student.get(student_id)),
+            areas_to_improve=(
+                override.areas_to_improve
+                if override and override.areas_to_improve is not None
+                else request.areas_to_improve
+            )
+        ))
+    return items
+
+async def create_feedback_batch(request: FeedbackBatchCreate, current_user: TokenData) -> FeedbackBatch:
+    """
+    Store a feedback batch; a feedback_batch job generates it
+    """
+    items = await _resolve_students(request)
+    
+    batch = FeedbackBatch(
+        created_by=current_user.user_id,
+        subject=request.subject,
+        institution_id=request.institution_id,
+        grade=request.grade,
+        total=len(items),
+        items=items
+    )
+    await batch.insert()
+    return batch
+
+async def run_feedback_batch(batch_id: str):
+    """
+    Generate the pending items of a stored batch and wait for them to finish
+    """
+    batch = await FeedbackBatch.get(parse_object_id(batch_id, "Feedback batch not found"))
+    if not batch:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Feedback batch not found"
+        )
+    
+    _batch_subscribers.setdefault(batch_id, [])
+    await _run_batch(batch)
+    
+    batch = await FeedbackBatch.get(batch.id)
+    return {"batch_id": batch_id, "completed": batch.completed, "failed": batch.failed}
+
+async def _generate_item(batch: FeedbackBatch, index: int, semaphore: asyncio.Semaphore):
+    item = batch.items[index]
+    async with semaphore:
+        try:
+            result = await generate_feedback(
+                item.student_name,
+                batch.subject,
+                item.performance,
+                item.areas_to_improve
+            )
+            error = result.get("error")
+        except HTTPException as e:
+            result, error = {}, e.detail
+    
+    item.completed_at = datetime.utcnow()
+    if error:
+        item.status, item.error = FeedbackItemStatus.FAILED, error
+    else:
+        item.status, item.feedback = FeedbackItemStatus.COMPLETED, result["feedback"]
+    
+    # Persist each result as soon as it is ready so polling sees progress
+    await FeedbackBatch.get_motor_collection().update_one(
+        {"_id": batch.id},
+        {
+            "$set": {
+                f"items.{index}": item.model_dump(),
+                "updated_at": item.completed_at
+            },
+            "$inc": {"completed" if item.status == FeedbackItemStatus.COMPLETED else "failed": 1}
+        }
+    )
+    _publish(str(batch.id), {"index": index, **item.model_dump()})
+
+async def _run_batch(batch: FeedbackBatch):
+    batch_id = str(batch.id)
+    semaphore = asyncio.Semaphore(FEEDBACK_BATCH_CONCURRENCY)
+    outcome = None
+    try:
+        # Items finished by an earlier, interrupted run are kept
+        await asyncio.gather(*(
+            _generate_item(batch, index, semaphore)
+            for index, item in enumerate(batch.items)
+            if item.status == FeedbackItemStatus.PENDING
+        ))
+        outcome = FeedbackBatchStatus.COMPLETED
+    except Exception:
+        logger.exception("Feedback batch %s failed", batch_id)
+        outcome = FeedbackBatchStatus.FAILED
+    finally:
+        # A cancelled run leaves the batch running so it can be resumed
+        if outcome is not None:
+            await FeedbackBatch.get_motor_collection().update_one(
+                {"_id": batch.id},
+                {"$set": {"status": outcome.value, "updated_at": datetime.utcnow()}}
+            )
+        _publish(batch_id, None)
+        _batch_subscribers.pop(batch_id, None)
+
+def _publish(batch_id: str, event: Optional[Dict[str, Any]]):
+    for queue in _batch_subscribers.get(batch_id, []):
+        queue.put_nowait(event)
+
+async def stream_feedback_batch(batch: FeedbackBatch) -> AsyncIterator[str]:
+    """
+    Stream a batch's results as NDJSON in completion order, ending with the batch totals.
+    Results finished before subscribing are sent first.
+    
+    Results of a batch run by this process are pushed as they finish; a batch
+    run by another process is reread every FEEDBACK_BATCH_POLL_INTERVAL.
+    """
+    batch_id = str(batch.id)
+    queue: asyncio.Queue = asyncio.Queue()
+    _batch_subscribers.setdefault(batch_id, []).append(queue)
+    
+    try:
+        current = await FeedbackBatch.get(batch.id)
+        sent = set()
+        while True:
+            for index, item in enumerate(current.items):
+                if item.status != FeedbackItemStatus.PENDING and index not in sent:
+                    sent.add(index)
+                    yield _ndjson({"index": index, **item.model_dump()})
+            if current.status != FeedbackBatchStatus.RUNNING:
+                break
+            
+            try:
+                event = await asyncio.wait_for(queue.get(), FEEDBACK_BATCH_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                event = None
+            if event is not None:
+                if event["index"] not in sent:
+                    sent.add(event["index"])
+                    yield _ndjson(event)
+                continue
+            current = await FeedbackBatch.get(batch.id)
+        
+        yield _ndjson({
+            "id": batch_id,
+            "status": current.status,
+            "total": current.total,
+            "completed": current.completed,
+            "failed": current.failed
+        })
+    finally:
+        subscribers = _batch_subscribers.get(batch_id, [])
+        if queue in subscribers:
+            subscribers.remove(queue)
+        if not subscribers:
+            _batch_subscribers.pop(batch_id, None)
+
+def _ndjson(row: Dict[str, Any]) -> str:
+    return json.dumps(jsonable_encoder(row), separators=(",", ":")) + "\n"
+
+async def get_feedback_batch(batch_id: str, current_user: TokenData) -> FeedbackBatch:
+    """
+    Get a feedback batch, visible to its creator and admins
+    """
+    batch = await FeedbackBatch.get(parse_object_id(batch_id, "Feedback batch not found"))
+    if not batch:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Feedback batch not found"
+        )
+    
+    # Only admins can see other users' batches
+    if current_user.role != "admin" and batch.created_by != current_user.user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    return batch
+
+def feedback_batch_response(batch: FeedbackBatch) -> FeedbackBatchResponse:
+    return FeedbackBatchResponse(id=str(batch.id), **batch.model_dump(exclude={"id", "revision_id"}))
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from dotenv import load_dotenv
+from pymongo.errors import OperationFailure
+
+from app.models.institution import Institution
+from app.utils.cache import LRUCache
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Institution cache configuration
+INSTITUTION_CACHE_SIZE = int(os.getenv("INSTITUTION_CACHE_SIZE", 1024))
+# Entry lifetime while no change stream is open, e.g. on a standalone server
+INSTITUTION_CACHE_TTL_SECONDS = float(os.getenv("INSTITUTION_CACHE_TTL_SECONDS", 30))
+INSTITUTION_CACHE_WATCH_RETRY_SECONDS = float(os.getenv("INSTITUTION_CACHE_WATCH_RETRY_SECONDS", 30))
+
+# Servers that are not replica set members cannot open change streams
+_CHANGE_STREAMS_UNSUPPORTED = 40573
+
+class InstitutionCache:
+    """
+    Process-local read-through cache of institution responses and listings.
+    
+    A change stream on the institutions collection clears the cache in every
+    worker whenever an institution is written. While no change stream is open,
+    entries expire after a TTL instead.
+    """
+    
+    def __init__(self, max_size: int, ttl: float):
+        self.ttl = ttl
+        self.invalidations = 0
+        self.watching = False
+        self._entries = LRUCache(max_size=max_size)
+        # Bumped on every invalidation so loads that raced a write are not stored
+        self._generation = 0
+        self._watch_task: Optional[asyncio.Task] = None
+    
+    async def get_or_load(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value for a key, loading and caching it on a miss
+        """
+        value = self._entries.get(key)
+        if value is not None:
+            return value
+        
+        generation = self._generation
+        value = await load()
+        if generation == self._generation:
+            self._entries.set(key, value, ttl=None if self.watching else self.ttl)
+        return value
+    
+    def invalidate(self):
+        """
+        Drop every cached entry; institutions are few, so any write clears them all
+        """
+        self._generation += 1
+        self.invalidations += 1
+        self._entries.clear()
+    
+    def start(self):
+        """
+        Start following institution changes
+        """
+        if self._watch_task is None:
+            self._watch_task = asyncio.create_task(self._watch())
+    
+    async def stop(self):
+        """
+        Stop following institution changes
+        """
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            await asyncio.gather(self._watch_task, return_exceptions=True)
+            self._watch_task = None
+        self.watching = False
+    
+    async def _watch(self):
+        while True:
+            try:
+                async with Institution.get_motor_collection().watch() as stream:
+                    self.watching = True
+                    logger.info("Institution cache is following the change stream")
+                    async for _ in stream:
+                        self.invalidate()
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code == _CHANGE_STREAMS_UNSUPPORTED:
+                    logger.info("Change streams unavailable, institution cache entries expire after %ss", self.ttl)
+                    return
+                logger.warning("Institution change stream failed", exc_info=True)
+            except Exception:
+                logger.warning("Institution change stream failed", exc_info=True)
+            finally:
+                if self.watching:
+                    # Entries cached without a TTL could miss changes from now on
+                    self.watching = False
+                    self.invalidate()
+            
+            await asyncio.sleep(INSTITUTION_CACHE_WATCH_RETRY_SECONDS)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Hit ratio, size and invalidation mode of the cache
+        """
+        return {
+            **self._entries.stats(),
+            "mode": "change_stream" if self.watching else "ttl",
+            "ttl_seconds": None if self.watching else self.ttl,
+            "invalidations": self.invalidations
+        }
+
+institution_cache = InstitutionCache(INSTITUTION_CACHE_SIZE, INSTITUTION_CACHE_TTL_SECONDS)
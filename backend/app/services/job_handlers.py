@@ -0,0 +1,76 @@
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+from dotenv import load_dotenv
+
+from app.controllers.score_controller import scores_export_cursor
+from app.controllers.student_controller import students_export_cursor
+from app.models.job import Job
+from app.services.ai_service import generate_lesson_plan, generate_quiz_questions
+from app.services.feedback_batch_service import run_feedback_batch
+from app.services.job_runner import JOB_RESULT_TTL_SECONDS, job_files, job_runner
+from app.utils.export import save_export
+
+# Load environment variables
+load_dotenv()
+
+# Jobs of each kind run at once per process
+JOB_AI_CONCURRENCY = int(os.getenv("JOB_AI_CONCURRENCY", 4))
+JOB_FEEDBACK_BATCH_CONCURRENCY = int(os.getenv("JOB_FEEDBACK_BATCH_CONCURRENCY", 2))
+JOB_EXPORT_CONCURRENCY = int(os.getenv("JOB_EXPORT_CONCURRENCY", 2))
+
+def _generated(result: Dict[str, Any]) -> Dict[str, Any]:
+    # Failed generations are reported as payloads; raise so the job is retried
+    if "error" in result:
+        raise RuntimeError(result["error"])
+    return result
+
+async def run_lesson_plan_job(job: Job) -> Dict[str, Any]:
+    return _generated(await generate_lesson_plan(**job.params))
+
+async def run_quiz_job(job: Job) -> Dict[str, Any]:
+    return _generated(await generate_quiz_questions(**job.params))
+
+async def run_feedback_batch_job(job: Job) -> Dict[str, Any]:
+    return await run_feedback_batch(job.params["batch_id"])
+
+async def _save_export_file(job: Job, cursor, columns, filename: str) -> Dict[str, Any]:
+    file_id = await save_export(
+        job_files(),
+        cursor,
+        columns,
+        job.params["export_format"],
+        job.params["batch_size"],
+        filename,
+        metadata={
+            "job_id": str(job.id),
+            "expires_at": datetime.utcnow() + timedelta(seconds=JOB_RESULT_TTL_SECONDS)
+        }
+    )
+    return {"file_id": file_id}
+
+async def run_students_export_job(job: Job) -> Dict[str, Any]:
+    params = job.params
+    cursor, columns = students_export_cursor(params["institution_id"], params["start"], params["end"])
+    return await _save_export_file(job, cursor, columns, "students")
+
+async def run_scores_export_job(job: Job) -> Dict[str, Any]:
+    params = job.params
+    cursor, columns = await scores_export_cursor(
+        params["institution_id"],
+        params["student_id"],
+        params["start"],
+        params["end"]
+    )
+    return await _save_export_file(job, cursor, columns, "scores")
+
+def register_job_handlers():
+    """
+    Register every job type with the shared runner
+    """
+    job_runner.register("lesson_plan", run_lesson_plan_job, JOB_AI_CONCURRENCY)
+    job_runner.register("quiz", run_quiz_job, JOB_AI_CONCURRENCY)
+    job_runner.register("feedback_batch", run_feedback_batch_job, JOB_FEEDBACK_BATCH_CONCURRENCY)
+    job_runner.register("students_export", run_students_export_job, JOB_EXPORT_CONCURRENCY)
+    job_runner.register("scores_export", run_scores_export_job, JOB_EXPORT_CONCURRENCY)
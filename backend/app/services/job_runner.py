@@ -0,0 +1,308 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+
+from app.config.auth import TokenData
+from app.models.job import Job, JobResponse, JobStatus
+from app.utils.projection import parse_object_id
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Job runner configuration
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 1))
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", 60))
+JOB_RESULT_TTL_SECONDS = int(os.getenv("JOB_RESULT_TTL_SECONDS", 86400))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+JOB_RETRY_DELAY_SECONDS = float(os.getenv("JOB_RETRY_DELAY_SECONDS", 5))
+JOB_FILE_PURGE_INTERVAL = 60
+# Jobs of a type are claimed highest priority first
+JOB_MIN_PRIORITY = -10
+JOB_MAX_PRIORITY = 10
+
+JobHandler = Callable[[Job], Awaitable[Optional[Dict[str, Any]]]]
+
+class _Registration:
+    def __init__(self, handler: JobHandler, concurrency: int):
+        self.handler = handler
+        self.concurrency = concurrency
+        self.running = 0
+
+def job_files() -> AsyncIOMotorGridFSBucket:
+    """
+    GridFS bucket holding job result files
+    """
+    return AsyncIOMotorGridFSBucket(Job.get_motor_collection().database, bucket_name="job_files")
+
+class JobRunner:
+    """
+    In-process worker for jobs stored in the jobs collection.
+    
+    Jobs are claimed with a single find_one_and_update, so any number of
+    app processes can poll the same collection. A claimed job carries a
+    lease that the owner renews while it runs; jobs whose lease expired,
+    because their worker died, are claimed again.
+    """
+    
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._handlers: Dict[str, _Registration] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._wakeup = asyncio.Event()
+        self._loop_task: Optional[asyncio.Task] = None
+        self._next_purge = 0.0
+    
+    def register(self, job_type: str, handler: JobHandler, concurrency: int = 1):
+        """
+        Register the coroutine running jobs of a type, with at most concurrency jobs at once per process
+        """
+        self._handlers[job_type] = _Registration(handler, concurrency)
+    
+    def notify(self):
+        self._wakeup.set()
+    
+    def start(self):
+        if self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """
+        Stop polling and hand running jobs back to the queue
+        """
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+            self._loop_task = None
+        
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        
+        await Job.get_motor_collection().update_many(
+            {"status": JobStatus.RUNNING.value, "lease_owner": self.worker_id},
+            {
+                "$set": {"status": JobStatus.QUEUED.value, "lease_owner": None, "lease_expires_at": None},
+                # An interrupted run does not count against the job
+                "$inc": {"attempts": -1}
+            }
+        )
+    
+    async def _run(self):
+        while True:
+            try:
+                await self._claim_available()
+                await self._purge_expired_files()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Job runner poll failed")
+            
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), JOB_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def _claim_available(self):
+        for job_type, registration in self._handlers.items():
+            while registration.running < registration.concurrency:
+                job = await self._claim(job_type)
+                if job is None:
+                    break
+                registration.running += 1
+                self._tasks[str(job.id)] = asyncio.create_task(self._execute(job, registration))
+    
+    async def _claim(self, job_type: str) -> Optional[Job]:
+        now = datetime.utcnow()
+        document = await Job.get_motor_collection().find_one_and_update(
+            {
+                "type": job_type,
+                "$or": [
+                    {"status": JobStatus.QUEUED.value, "run_after": {"$lte": now}},
+                    {"status": JobStatus.RUNNING.value, "lease_expires_at": {"$lt": now}}
+                ]
+            },
+            {
+                "$set": {
+                    "status": JobStatus.RUNNING.value,
+                    "lease_owner": self.worker_id,
+                    "lease_expires_at": now + timedelta(seconds=JOB_LEASE_SECONDS),
+                    "started_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("priority", DESCENDING), ("run_after", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+        return Job.model_validate(document) if document else None
+    
+    async def _execute(self, job: Job, registration: _Registration):
+        heartbeat = asyncio.create_task(self._renew_lease(job, asyncio.current_task()))
+        try:
+            if job.attempts > job.max_attempts:
+                # Its previous workers died mid-run too often
+                await self._finish(job, JobStatus.FAILED, error="Job lease expired too many times")
+                return
+            
+            try:
+                result = await registration.handler(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Job %s (%s) attempt %d failed", job.id, job.type, job.attempts, exc_info=True)
+                error = e.detail if isinstance(e, HTTPException) else str(e)
+                if job.attempts < job.max_attempts:
+                    await self._retry(job, error)
+                else:
+                    await self._finish(job, JobStatus.FAILED, error=error)
+                return
+            
+            await self._finish(job, JobStatus.SUCCEEDED, result=result or {})
+        finally:
+            heartbeat.cancel()
+            registration.running -= 1
+            self._tasks.pop(str(job.id), None)
+            # A slot is free again
+            self.notify()
+    
+    async def _renew_lease(self, job: Job, execution: asyncio.Task):
+        while True:
+            await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+            try:
+                renewed = await Job.get_motor_collection().update_one(
+                    {"_id": job.id, "lease_owner": self.worker_id},
+                    {"$set": {"lease_expires_at": datetime.utcnow() + timedelta(seconds=JOB_LEASE_SECONDS)}}
+                )
+            except Exception:
+                # A missed renewal is retried on the next beat, well before the lease runs out
+                logger.warning("Renewing the lease of job %s failed", job.id, exc_info=True)
+                continue
+            
+            if not renewed.matched_count:
+                # The lease expired and another worker claimed the job; stop running it twice
+                logger.warning("Lost the lease of job %s (%s), cancelling it", job.id, job.type)
+                execution.cancel()
+                return
+    
+    async def _retry(self, job: Job, error: str):
+        delay = JOB_RETRY_DELAY_SECONDS * 2 ** (job.attempts - 1)
+        await Job.get_motor_collection().update_one(
+            {"_id": job.id, "lease_owner": self.worker_id},
+            {"$set": {
+                "status": JobStatus.QUEUED.value,
+                "error": error,
+                "lease_owner": None,
+                "lease_expires_at": None,
+                "run_after": datetime.utcnow() + timedelta(seconds=delay)
+            }}
+        )
+    
+    async def _finish(
+        self,
+        job: Job,
+        job_status: JobStatus,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None
+    ):
+        now = datetime.utcnow()
+        update = {
+            "status": job_status.value,
+            "result": result,
+            "error": error,
+            "lease_owner": None,
+            "lease_expires_at": None,
+            "finished_at": now,
+            "expires_at": now + timedelta(seconds=JOB_RESULT_TTL_SECONDS)
+        }
+        # Handlers that write a file report its id in the result
+        if result and "file_id" in result:
+            update["result_file_id"] = str(result.pop("file_id"))
+        
+        await Job.get_motor_collection().update_one(
+            {"_id": job.id, "lease_owner": self.worker_id},
+            {"$set": update}
+        )
+    
+    async def _purge_expired_files(self):
+        # The TTL index removes finished jobs but not their GridFS files
+        if time.monotonic() < self._next_purge:
+            return
+        self._next_purge = time.monotonic() + JOB_FILE_PURGE_INTERVAL
+        
+        bucket = job_files()
+        async for grid_file in bucket.find({"metadata.expires_at": {"$lt": datetime.utcnow()}}):
+            await bucket.delete(grid_file._id)
+
+# Shared runner for this process
+job_runner = JobRunner()
+
+async def enqueue_job(
+    job_type: str,
+    params: Dict[str, Any],
+    created_by: Optional[str] = None,
+    priority: int = 0,
+    max_attempts: int = JOB_MAX_ATTEMPTS
+) -> Job:
+    """
+    Queue a job for the runner
+    """
+    job = Job(
+        type=job_type,
+        params=params,
+        priority=priority,
+        max_attempts=max_attempts,
+        created_by=created_by
+    )
+    await job.insert()
+    job_runner.notify()
+    return job
+
+def check_job_priority(priority: int, current_user: Optional[TokenData]):
+    """
+    Only admins can queue a job ahead of the default priority
+    """
+    if priority > 0 and current_user and current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can raise a job's priority"
+        )
+
+async def get_job(job_id: str, current_user: TokenData) -> Job:
+    """
+    Get a job, visible to its creator and admins
+    """
+    job = await Job.get(parse_object_id(job_id, "Job not found"))
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    # Only admins can see other users' jobs
+    if current_user.role != "admin" and job.created_by != current_user.user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    return job
+
+def job_response(job: Job) -> JobResponse:
+    return JobResponse(
+        id=str(job.id),
+        result_url=f"/api/jobs/{job.id}/result" if job.result_file_id else None,
+        **job.model_dump(include=set(JobResponse.model_fields) - {"id", "result_url"})
+    )
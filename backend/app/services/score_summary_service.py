@@ -0,0 +1,205 @@
+import asyncio
+import math
+import os
+import sys
+from datetime import datetime
+from typing import Iterable, Optional
+
+from dotenv import load_dotenv
+from pymongo import ReturnDocument, UpdateOne
+
+from app.models.score import Score
+from app.models.score_summary import (
+    StudentScoreSummary,
+    SubjectSummaryResponse,
+    StudentScoreSummaryResponse
+)
+
+# Load environment variables
+load_dotenv()
+
+# Number of most recent scores kept per student and subject
+SUMMARY_RECENT_SCORES = int(os.getenv("SUMMARY_RECENT_SCORES", 10))
+
+def _normalized(score_value: float, max_score: float) -> Optional[float]:
+    if max_score <= 0:
+        return None
+    return score_value / max_score
+
+def _summary_filter(student_id: str, subject: str) -> dict:
+    return {"student_id": student_id, "subject": subject}
+
+async def apply_scores_inserted(scores: Iterable[Score]):
+    """
+    Fold newly inserted scores into their summaries with one bulk write
+    """
+    now = datetime.utcnow()
+    operations = []
+    
+    for score in scores:
+        value = _normalized(score.score_value, score.max_score)
+        if value is None:
+            continue
+        
+        operations.append(UpdateOne(
+            _summary_filter(score.student_id, score.subject),
+            {
+                "$inc": {"value_count": 1, "value_sum": value, "value_sum_sq": value * value},
+                "$min": {"min_value": value},
+                "$max": {"max_value": value},
+                "$push": {"recent": {
+                    "$each": [{"score_id": str(score.id), "value": value, "date": score.date}],
+                    "$sort": {"date": -1},
+                    "$slice": SUMMARY_RECENT_SCORES
+                }},
+                "$set": {"updated_at": now}
+            },
+            upsert=True
+        ))
+    
+    if operations:
+        await StudentScoreSummary.get_motor_collection().bulk_write(operations, ordered=False)
+
+async def apply_score_updated(score: Score, old_score_value: float, old_max_score: float):
+    """
+    Adjust a summary for a score whose value changed
+    """
+    old_value = _normalized(old_score_value, old_max_score)
+    new_value = _normalized(score.score_value, score.max_score)
+    
+    if old_value is None or new_value is None:
+        await recompute_summary(score.student_id, score.subject)
+        return
+    
+    summary = await StudentScoreSummary.get_motor_collection().find_one_and_update(
+        _summary_filter(score.student_id, score.subject),
+        {
+            "$inc": {"value_sum": new_value - old_value, "value_sum_sq": new_value * new_value - old_value * old_value},
+            "$min": {"min_value": new_value},
+            "$max": {"max_value": new_value},
+            "$set": {"recent.$[entry].value": new_value, "updated_at": datetime.utcnow()}
+        },
+        array_filters=[{"entry.score_id": str(score.id)}],
+        return_document=ReturnDocument.AFTER
+    )
+    
+    # The old value may have been the extreme; only a rescan can find the new one
+    if summary is None or math.isclose(old_value, summary["min_value"]) or math.isclose(old_value, summary["max_value"]):
+        await recompute_summary(score.student_id, score.subject)
+
+async def apply_score_removed(score: Score):
+    """
+    Remove a deleted score from its summary
+    """
+    value = _normalized(score.score_value, score.max_score)
+    if value is None:
+        return
+    
+    summary = await StudentScoreSummary.get_motor_collection().find_one_and_update(
+        _summary_filter(score.student_id, score.subject),
+        {
+            "$inc": {"value_count": -1, "value_sum": -value, "value_sum_sq": -value * value},
+            "$pull": {"recent": {"score_id": str(score.id)}},
+            "$set": {"updated_at": datetime.utcnow()}
+        },
+        return_document=ReturnDocument.AFTER
+    )
+    
+    if summary is None:
+        return
+    
+    if summary["value_count"] <= 0:
+        await StudentScoreSummary.get_motor_collection().delete_one({"_id": summary["_id"]})
+    elif (
+        math.isclose(value, summary["min_value"])
+        or math.isclose(value, summary["max_value"])
+        or len(summary["recent"]) < min(summary["value_count"], SUMMARY_RECENT_SCORES)
+    ):
+        await recompute_summary(score.student_id, score.subject)
+
+def _summary_pipeline(match: dict) -> list:
+    return [
+        {"$match": {**match, "max_score": {"$gt": 0}}},
+        {"$set": {"normalized": {"$divide": ["$score_value", "$max_score"]}}},
+        {"$sort": {"date": -1}},
+        {"$group": {
+            "_id": {"student_id": "$student_id", "subject": "$subject"},
+            "value_count": {"$sum": 1},
+            "value_sum": {"$sum": "$normalized"},
+            "value_sum_sq": {"$sum": {"$multiply": ["$normalized", "$normalized"]}},
+            "min_value": {"$min": "$normalized"},
+            "max_value": {"$max": "$normalized"},
+            "recent": {"$push": {"score_id": {"$toString": "$_id"}, "value": "$normalized", "date": "$date"}}
+        }},
+        {"$project": {
+            "_id": 0,
+            "student_id": "$_id.student_id",
+            "subject": "$_id.subject",
+            "value_count": 1,
+            "value_sum": 1,
+            "value_sum_sq": 1,
+            "min_value": 1,
+            "max_value": 1,
+            "recent": {"$slice": ["$recent", SUMMARY_RECENT_SCORES]},
+            "updated_at": "$$NOW"
+        }}
+    ]
+
+async def recompute_summary(student_id: str, subject: str):
+    """
+    Rebuild one student's summary for a subject from the scores collection
+    """
+    rows = await Score.get_motor_collection().aggregate(
+        _summary_pipeline(_summary_filter(student_id, subject))
+    ).to_list(length=1)
+    
+    collection = StudentScoreSummary.get_motor_collection()
+    if rows:
+        await collection.replace_one(_summary_filter(student_id, subject), rows[0], upsert=True)
+    else:
+        await collection.delete_one(_summary_filter(student_id, subject))
+
+async def rebuild_summaries():
+    """
+    Backfill every summary from the scores collection, replacing the existing ones
+    """
+    pipeline = _summary_pipeline({})
+    pipeline.append({"$out": StudentScoreSummary.get_settings().name})
+    await Score.get_motor_collection().aggregate(pipeline).to_list(length=None)
+
+async def get_student_summary(student_id: str) -> StudentScoreSummaryResponse:
+    """
+    Get a student's running score summaries with an indexed point lookup
+    """
+    summaries = await StudentScoreSummary.find({"student_id": student_id}).sort("subject").to_list()
+    
+    subjects = []
+    for summary in summaries:
+        mean = summary.value_sum / summary.value_count
+        variance = max(summary.value_sum_sq / summary.value_count - mean * mean, 0.0)
+        subjects.append(SubjectSummaryResponse(
+            subject=summary.subject,
+            count=summary.value_count,
+            mean=mean,
+            std_dev=math.sqrt(variance),
+            min=summary.min_value,
+            max=summary.max_value,
+            recent=summary.recent,
+            updated_at=summary.updated_at
+        ))
+    
+    return StudentScoreSummaryResponse(student_id=student_id, subjects=subjects)
+
+async def _main(command: str):
+    from app.config.database import init_db
+    
+    await init_db()
+    if command == "rebuild":
+        await rebuild_summaries()
+        print("Student score summaries rebuilt")
+
+if __name__ == "__main__":
+    # Usage: python -m app.services.score_summary_service rebuild
+    if sys.argv[1:] != ["rebuild"]:
+        sys.exit("Usage: python -m app.services.score_summary_service rebuild")
+    asyncio.run(_main(sys.argv[1]))
@@ -0,0 +1,102 @@
+import base64
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Type
+
+import bson
+from beanie import Document
+from dotenv import load_dotenv
+from fastapi import Header, HTTPException, Response, status
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorCollection
+from pymongo.read_concern import ReadConcern
+from pymongo.read_preferences import make_read_preference, read_pref_mode_from_name
+
+from app.config.database import get_client
+
+# Load environment variables
+load_dotenv()
+
+# Per route read routing; heavy reads may go to secondaries
+MONGODB_LIST_READ_PREFERENCE = os.getenv("MONGODB_LIST_READ_PREFERENCE", "secondaryPreferred")
+MONGODB_LIST_READ_CONCERN = os.getenv("MONGODB_LIST_READ_CONCERN", "majority")
+MONGODB_ANALYTICS_READ_PREFERENCE = os.getenv("MONGODB_ANALYTICS_READ_PREFERENCE", "secondaryPreferred")
+MONGODB_ANALYTICS_READ_CONCERN = os.getenv("MONGODB_ANALYTICS_READ_CONCERN", "majority")
+
+# Header carrying the cluster and operation time of a client's last write
+CAUSAL_TOKEN_HEADER = "X-Causal-Token"
+
+READ_ROUTES = {
+    "lists": (MONGODB_LIST_READ_PREFERENCE, MONGODB_LIST_READ_CONCERN),
+    "analytics": (MONGODB_ANALYTICS_READ_PREFERENCE, MONGODB_ANALYTICS_READ_CONCERN)
+}
+
+_read_options = {
+    route: {
+        "read_preference": make_read_preference(read_pref_mode_from_name(preference), None),
+        "read_concern": ReadConcern(concern or None)
+    }
+    for route, (preference, concern) in READ_ROUTES.items()
+}
+
+def routed_collection(model: Type[Document], route: str) -> AsyncIOMotorCollection:
+    """
+    Collection of a model with the read preference and read concern configured for a route
+    """
+    return model.get_motor_collection().with_options(**_read_options[route])
+
+def read_causal_token(
+    x_causal_token: Optional[str] = Header(None, description="Token from a previous write; reads then include that write")
+) -> Optional[str]:
+    """
+    Causal token sent with a request, for use as a dependency
+    """
+    return x_causal_token
+
+def _restore_token(session: AsyncIOMotorClientSession, token: str):
+    try:
+        times = bson.decode(base64.urlsafe_b64decode(token.encode()))
+        if times.get("clusterTime"):
+            session.advance_cluster_time(times["clusterTime"])
+        if times.get("operationTime"):
+            session.advance_operation_time(times["operationTime"])
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid {CAUSAL_TOKEN_HEADER} header"
+        )
+
+@asynccontextmanager
+async def causal_session(token: Optional[str] = None) -> AsyncIterator[AsyncIOMotorClientSession]:
+    """
+    Causally consistent session, continuing after the write a causal token was issued for.
+    
+    Reads in the session wait until the member they run on has caught up with
+    that write, so a secondary read still sees the caller's own changes.
+    """
+    async with await get_client().start_session(causal_consistency=True) as session:
+        if token:
+            _restore_token(session, token)
+        yield session
+
+def causal_token(session: AsyncIOMotorClientSession) -> Optional[str]:
+    """
+    Encode the cluster and operation time a session has reached
+    """
+    if session.operation_time is None:
+        # Standalone servers do not report operation times
+        return None
+    times = {"clusterTime": session.cluster_time, "operationTime": session.operation_time}
+    return base64.urlsafe_b64encode(bson.encode(times)).decode()
+
+def causal_token_headers(session: AsyncIOMotorClientSession) -> Dict[str, str]:
+    """
+    Response headers carrying the causal token of a session
+    """
+    token = causal_token(session)
+    return {CAUSAL_TOKEN_HEADER: token} if token else {}
+
+def set_causal_token(response: Response, session: AsyncIOMotorClientSession):
+    """
+    Return the causal token of a session to the client
+    """
+    response.headers.update(causal_token_headers(session))
@@ -0,0 +1,32 @@
+import re
+from typing import Dict, Optional
+
+from fastapi import HTTPException, status
+from pymongo.errors import DuplicateKeyError
+
+def duplicate_key_field(error: DuplicateKeyError) -> Optional[str]:
+    """
+    First field of the unique index a DuplicateKeyError was raised for
+    """
+    details = error.details or {}
+    key_pattern = details.get("keyPattern") or details.get("keyValue")
+    if key_pattern:
+        return next(iter(key_pattern))
+
+    # Servers before 4.2 only name the index in the message
+    message = details.get("errmsg", str(error))
+    if "index: " in message:
+        index_name = message.split("index: ", 1)[1].split(" ", 1)[0]
+        match = re.match(r"(.+?)(?:_-?1(?:_|$))", index_name)
+        return match.group(1) if match else index_name
+    return None
+
+def duplicate_error(error: DuplicateKeyError, messages: Dict[str, str]) -> HTTPException:
+    """
+    Map a unique index violation to the 400 response for the duplicated field
+    """
+    field = duplicate_key_field(error)
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=messages.get(field, "Duplicate value")
+    )
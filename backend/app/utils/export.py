@@ -0,0 +1,147 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Sequence
+
+from bson import ObjectId
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+def export_row(document: Mapping[str, Any], columns: Sequence[str]) -> Dict[str, Any]:
+    """
+    Convert a raw document into an export row with the given columns
+    """
+    row = {}
+    for column in columns:
+        value = document.get("_id") if column == "id" else document.get(column)
+        row[column] = _plain(value)
+    return row
+
+def date_range_filter(field: str, start: Optional[datetime], end: Optional[datetime]) -> Dict[str, Any]:
+    """
+    Build an inclusive start / exclusive end date filter
+    """
+    bounds = {}
+    if start:
+        bounds["$gte"] = start
+    if end:
+        bounds["$lt"] = end
+    return {field: bounds} if bounds else {}
+
+async def _ndjson_chunks(cursor, columns: Sequence[str], batch_size: int) -> AsyncIterator[str]:
+    lines: List[str] = []
+    async for document in cursor:
+        lines.append(json.dumps(export_row(document, columns), separators=(",", ":")))
+        if len(lines) >= batch_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+async def _csv_chunks(cursor, columns: Sequence[str], batch_size: int) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(columns))
+    writer.writeheader()
+    rows = 0
+    async for document in cursor:
+        writer.writerow(export_row(document, columns))
+        rows += 1
+        if rows >= batch_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def check_export_format(export_format: str):
+    if export_format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported export format '{export_format}'"
+        )
+
+def export_chunks(cursor, columns: Sequence[str], export_format: str, batch_size: int) -> AsyncIterator[str]:
+    """
+    Render a Motor cursor as NDJSON or CSV text, one chunk per cursor batch
+    """
+    check_export_format(export_format)
+    
+    cursor = cursor.batch_size(batch_size)
+    if export_format == "csv":
+        return _csv_chunks(cursor, columns, batch_size)
+    return _ndjson_chunks(cursor, columns, batch_size)
+
+def _attachment(filename: str, export_format: str) -> Dict[str, str]:
+    return {"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'}
+
+def stream_export(cursor, columns: Sequence[str], export_format: str, batch_size: int, filename: str) -> StreamingResponse:
+    """
+    Stream a Motor cursor as NDJSON or CSV, one network chunk per cursor batch
+    """
+    return StreamingResponse(
+        export_chunks(cursor, columns, export_format, batch_size),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers=_attachment(filename, export_format)
+    )
+
+async def save_export(
+    bucket,
+    cursor,
+    columns: Sequence[str],
+    export_format: str,
+    batch_size: int,
+    filename: str,
+    metadata: Optional[Dict[str, Any]] = None
+) -> ObjectId:
+    """
+    Write a Motor cursor as NDJSON or CSV into a GridFS file, returning its id
+    """
+    upload = bucket.open_upload_stream(
+        f"{filename}.{export_format}",
+        metadata={**(metadata or {}), "format": export_format}
+    )
+    try:
+        async for chunk in export_chunks(cursor, columns, export_format, batch_size):
+            await upload.write(chunk.encode())
+    except BaseException:
+        await upload.abort()
+        raise
+    await upload.close()
+    return upload._id
+
+async def stream_saved_export(bucket, file_id: ObjectId) -> StreamingResponse:
+    """
+    Stream an export file stored by save_export
+    """
+    download = await bucket.open_download_stream(file_id)
+    export_format = download.metadata["format"]
+    
+    async def chunks() -> AsyncIterator[bytes]:
+        while True:
+            chunk = await download.readchunk()
+            if not chunk:
+                break
+            yield chunk
+    
+    return StreamingResponse(
+        chunks(),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers=_attachment(download.filename.rsplit(".", 1)[0], export_format)
+    )
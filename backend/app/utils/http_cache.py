@@ -0,0 +1,62 @@
+import hashlib
+import os
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+from fastapi import Response, status
+
+# Load environment variables
+load_dotenv()
+
+# Cache-Control per route; no-cache lets clients keep copies but revalidate them with the ETag
+INSTITUTION_LIST_CACHE_CONTROL = os.getenv("INSTITUTION_LIST_CACHE_CONTROL", "private, no-cache")
+INSTITUTION_CACHE_CONTROL = os.getenv("INSTITUTION_CACHE_CONTROL", "private, no-cache")
+STUDENT_CACHE_CONTROL = os.getenv("STUDENT_CACHE_CONTROL", "private, no-cache")
+
+CACHE_CONTROL = {
+    "institutions": INSTITUTION_LIST_CACHE_CONTROL,
+    "institution": INSTITUTION_CACHE_CONTROL,
+    "student": STUDENT_CACHE_CONTROL
+}
+
+def make_etag(*parts: Any) -> str:
+    """
+    Strong ETag over the given version parts
+    """
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+def document_etag(document: Any) -> str:
+    """
+    ETag of a single document response, from its id, version and updated_at
+    """
+    return make_etag(document.id, document.version, document.updated_at.isoformat())
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches an ETag, using weak comparison as RFC 9110 asks
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in if_none_match.split(","))
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+def cache_headers(etag: str, route: str) -> Dict[str, str]:
+    """
+    ETag and Cache-Control headers of a cacheable route
+    """
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL[route]}
+
+def set_cache_headers(response: Response, etag: str, route: str):
+    """
+    Expose the ETag and Cache-Control of a cacheable route on the response
+    """
+    response.headers.update(cache_headers(etag, route))
+
+def not_modified(etag: str, route: str) -> Response:
+    """
+    Empty 304 response telling the client its cached copy is still current
+    """
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag, route))
@@ -0,0 +1,49 @@
+import logging
+from typing import Any, Dict, List, Sequence, Tuple, Type
+
+from beanie import Document
+from pymongo import IndexModel
+
+logger = logging.getLogger(__name__)
+
+# Index options that change what an index enforces
+_INDEX_OPTIONS = ("unique", "expireAfterSeconds", "sparse", "partialFilterExpression")
+
+def _signature(keys: Sequence[Tuple[str, Any]], options: Dict[str, Any]) -> Tuple:
+    return (
+        # Older servers report numeric directions as floats
+        tuple((field, int(direction) if isinstance(direction, float) else direction) for field, direction in keys),
+        tuple((option, repr(options[option])) for option in _INDEX_OPTIONS if option in options)
+    )
+
+def _declared_indexes(model: Type[Document]) -> Dict[Tuple, str]:
+    declared = {}
+    for index in model.get_settings().indexes or []:
+        document = index.document if isinstance(index, IndexModel) else index.index.document
+        declared[_signature(list(document["key"].items()), document)] = document["name"]
+    return declared
+
+async def verify_indexes(document_models: Sequence[Type[Document]]) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Compare each collection's indexes with its Settings.indexes and log any drift
+    """
+    drift = {}
+    for model in document_models:
+        collection = model.get_motor_collection()
+        declared = _declared_indexes(model)
+        existing = {
+            _signature(info["key"], info): name
+            for name, info in (await collection.index_information()).items()
+            if name != "_id_"
+        }
+        
+        missing = [name for signature, name in declared.items() if signature not in existing]
+        undeclared = [name for signature, name in existing.items() if signature not in declared]
+        if missing or undeclared:
+            drift[collection.name] = {"missing": missing, "undeclared": undeclared}
+            logger.warning(
+                "Index drift on %s: missing %s, undeclared %s",
+                collection.name, missing or "none", undeclared or "none"
+            )
+    
+    return drift
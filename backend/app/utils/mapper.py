@@ -0,0 +1,65 @@
+from typing import Any, Dict, Generic, Iterable, List, Mapping, Tuple, Type, TypeVar, Union
+
+from beanie import Document
+from pydantic import BaseModel
+
+ResponseT = TypeVar("ResponseT", bound=BaseModel)
+
+class ResponseMapper(Generic[ResponseT]):
+    """
+    Maps stored documents of one collection to a response model.
+    
+    The field list is checked against the document model once, at import,
+    so a response model that drifts from its collection fails on startup
+    instead of on the first request.
+    """
+    
+    def __init__(self, document_model: Type[Document], response_model: Type[ResponseT]):
+        self.document_model = document_model
+        self.response_model = response_model
+        
+        stored = document_model.model_fields
+        mismatched = [
+            name for name, field in response_model.model_fields.items()
+            if name != "id" and (name not in stored or stored[name].annotation != field.annotation)
+        ]
+        if mismatched:
+            raise TypeError(
+                f"{response_model.__name__} fields {', '.join(mismatched)} "
+                f"do not match {document_model.__name__}"
+            )
+        
+        # Field names with the value used when a stored document lacks them
+        self._fields: Tuple[Tuple[str, Any], ...] = tuple(
+            (name, None if field.is_required() else field.get_default(call_default_factory=True))
+            for name, field in response_model.model_fields.items()
+            if name != "id"
+        )
+        # Mongo projection fetching exactly the response fields
+        self.projection: Dict[str, int] = {name: 1 for name, _ in self._fields}
+    
+    def payload(self, document: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Response payload of a raw document, without validation
+        """
+        payload = {"id": str(document["_id"])}
+        for name, default in self._fields:
+            payload[name] = document.get(name, default)
+        return payload
+    
+    def payloads(self, documents: Iterable[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Response payloads of raw documents, for list routes serialized as they are
+        """
+        return [self.payload(document) for document in documents]
+    
+    def response(self, document: Union[Document, Mapping[str, Any]]) -> ResponseT:
+        """
+        Validated response model of a Beanie document or raw document
+        """
+        if isinstance(document, Document):
+            values = {"id": str(document.id)}
+            for name, _ in self._fields:
+                values[name] = getattr(document, name)
+            return self.response_model.model_validate(values)
+        return self.response_model.model_validate(self.payload(document))
@@ -0,0 +1,128 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException, Response, status
+from pymongo import ASCENDING
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid pagination cursor"
+    )
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    return value
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "$date" in value:
+        return datetime.fromisoformat(value["$date"])
+    return value
+
+def encode_cursor(sort_by: str, value: Any, object_id: str) -> str:
+    """
+    Build an opaque cursor pointing just after the given row
+    """
+    payload = {"s": sort_by, "v": _encode_value(value), "id": str(object_id)}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[str, Any, ObjectId]:
+    """
+    Decode an opaque cursor into its sort key, sort value and ObjectId
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return payload["s"], _decode_value(payload["v"]), ObjectId(payload["id"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise _invalid_cursor()
+
+def resolve_sort_key(sort_by: Optional[str], after: Optional[str]) -> str:
+    """
+    Effective sort key of a page request; a cursor carries its own sort key
+    """
+    if sort_by is None and after is not None:
+        return decode_cursor(after)[0]
+    return sort_by or "_id"
+
+def build_page_query(
+    filters: Dict[str, Any],
+    sort_by: Optional[str],
+    after: Optional[str],
+    sort_fields: Sequence[str]
+) -> Tuple[Dict[str, Any], str, List[Tuple[str, int]]]:
+    """
+    Combine filters with a keyset condition for cursor pagination.
+
+    Returns the query, the effective sort key and the sort specification.
+    Results are always ordered by the sort key with _id as tie-breaker so
+    offset and cursor pages walk the collection in the same order.
+    """
+    if sort_by is not None and sort_by != "_id" and sort_by not in sort_fields:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot sort by '{sort_by}'"
+        )
+
+    if after is None:
+        sort_by = sort_by or "_id"
+        return filters, sort_by, _sort_spec(sort_by)
+
+    cursor_sort, value, object_id = decode_cursor(after)
+    if cursor_sort != "_id" and cursor_sort not in sort_fields:
+        raise _invalid_cursor()
+    if sort_by is not None and sort_by != cursor_sort:
+        raise _invalid_cursor()
+
+    if cursor_sort == "_id":
+        keyset = {"_id": {"$gt": object_id}}
+    elif value is None:
+        # Nulls sort first, so every non-null value comes after them
+        keyset = {"$or": [
+            {cursor_sort: None, "_id": {"$gt": object_id}},
+            {cursor_sort: {"$ne": None}}
+        ]}
+    else:
+        keyset = {"$or": [
+            {cursor_sort: {"$gt": value}},
+            {cursor_sort: value, "_id": {"$gt": object_id}}
+        ]}
+
+    query = {"$and": [filters, keyset]} if filters else keyset
+    return query, cursor_sort, _sort_spec(cursor_sort)
+
+def _sort_spec(sort_by: str) -> List[Tuple[str, int]]:
+    if sort_by == "_id":
+        return [("_id", ASCENDING)]
+    return [(sort_by, ASCENDING), ("_id", ASCENDING)]
+
+def next_cursor_headers(items: Sequence[Any], limit: int, sort_by: str) -> Dict[str, str]:
+    """
+    Headers exposing the cursor of the next page when the current page is full
+    """
+    if not items or len(items) < limit:
+        return {}
+
+    last = items[-1]
+    if isinstance(last, dict):
+        value = None if sort_by == "_id" else last.get(sort_by)
+        object_id = last["id"]
+    else:
+        value = None if sort_by == "_id" else getattr(last, sort_by)
+        object_id = last.id
+    return {NEXT_CURSOR_HEADER: encode_cursor(sort_by, value, object_id)}
+
+def set_next_cursor(response: Response, items: Sequence[Any], limit: int, sort_by: str):
+    """
+    Expose the cursor of the next page on the response
+    """
+    response.headers.update(next_cursor_headers(items, limit, sort_by))
@@ -0,0 +1,55 @@
+from typing import Any, Dict, Iterable, Mapping, Optional, Type
+
+from beanie import PydanticObjectId
+from bson import ObjectId
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+
+def parse_fields(
+    fields: Optional[str],
+    response_model: Type[BaseModel],
+    always: Iterable[str] = ()
+) -> Optional[Dict[str, int]]:
+    """
+    Turn a comma separated sparse fieldset into a Mongo projection.
+
+    The id and any fields listed in always (e.g. the pagination sort key)
+    are always returned. Returns None when no fieldset was requested.
+    """
+    if not fields:
+        return None
+
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in response_model.model_fields]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+
+    projection = {"_id": 1}
+    for name in [*requested, *always]:
+        if name not in ("id", "_id"):
+            projection[name] = 1
+    return projection
+
+def sparse_row(document: Mapping[str, Any], projection: Dict[str, int]) -> Dict[str, Any]:
+    """
+    Build a sparse response row from a projected raw document
+    """
+    row = {"id": str(document["_id"])}
+    for name in projection:
+        if name != "_id":
+            row[name] = document.get(name)
+    return row
+
+def parse_object_id(value: str, detail: str) -> PydanticObjectId:
+    """
+    Parse a path id, answering 404 for ids that cannot exist
+    """
+    if not ObjectId.is_valid(value):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=detail
+        )
+    return PydanticObjectId(value)
@@ -0,0 +1,29 @@
+from typing import Any
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+def _encode_default(value: Any) -> Any:
+    # orjson handles datetimes, enums and UUIDs natively; these are the rest
+    if isinstance(value, BaseModel):
+        return value.model_dump(by_alias=True)
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+class APIResponse(ORJSONResponse):
+    """
+    JSON response serialized with orjson, accepting pydantic models and ObjectIds.
+    
+    Returning it from a route skips FastAPI's response_model validation and
+    serializes the content as it is. List routes return ResponseMapper
+    payloads and sparse rows this way: plain dicts that are not validated
+    again, so they must already have the declared response model's shape.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_encode_default, option=orjson.OPT_NON_STR_KEYS)
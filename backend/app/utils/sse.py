@@ -0,0 +1,24 @@
+import json
+from typing import Any, AsyncIterator
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Keep reverse proxies from buffering the event stream
+    "X-Accel-Buffering": "no",
+}
+
+def sse_event(event: str, data: Any) -> str:
+    """
+    Encode one Server-Sent Event with a JSON payload
+    """
+    payload = json.dumps(jsonable_encoder(data), separators=(",", ":"))
+    return f"event: {event}\ndata: {payload}\n\n"
+
+def stream_sse(events: AsyncIterator[str]) -> StreamingResponse:
+    """
+    Send already encoded events as a text/event-stream response
+    """
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
@@ -0,0 +1,61 @@
+import math
+import statistics
+from typing import Any, Dict, List, Sequence
+
+# Percentiles reported for every group of scores
+PERCENTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+def percentile_key(p: float) -> str:
+    return f"p{int(round(p * 100))}"
+
+def histogram_bin(value: float, bins: int) -> int:
+    """
+    Bin index of a normalized score, clamping out-of-range values to the edges
+    """
+    return min(max(int(math.floor(value * bins)), 0), bins - 1)
+
+def describe(values: Sequence[float], bins: int = 10) -> Dict[str, Any]:
+    """
+    Summary statistics of normalized scores, shaped like a score stats group
+    """
+    ordered = sorted(values)
+    count = len(ordered)
+    if not count:
+        return {"count": 0}
+    
+    histogram = [0] * bins
+    for value in ordered:
+        histogram[histogram_bin(value, bins)] += 1
+    
+    return {
+        "count": count,
+        "mean": statistics.fmean(ordered),
+        "median": statistics.median(ordered),
+        "std_dev": statistics.pstdev(ordered),
+        "min": ordered[0],
+        "max": ordered[-1],
+        "percentiles": {percentile_key(p): _percentile(ordered, p) for p in PERCENTILES},
+        "histogram": histogram
+    }
+
+def _percentile(ordered: List[float], p: float) -> float:
+    # Linear interpolation between closest ranks
+    position = (len(ordered) - 1) * p
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return ordered[lower]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def outlier_indexes(values: Sequence[float], q1: float, q3: float, k: float = 1.5) -> List[int]:
+    """
+    Indexes of values outside the Tukey fences, most extreme first
+    """
+    spread = k * (q3 - q1)
+    low, high = q1 - spread, q3 + spread
+    distances = {
+        index: max(low - value, value - high)
+        for index, value in enumerate(values)
+        if value < low or value > high
+    }
+    return sorted(distances, key=distances.get, reverse=True)
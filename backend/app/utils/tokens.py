@@ -0,0 +1,47 @@
+import logging
+from functools import lru_cache
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+except ImportError:
+    # Token counts are estimated without tiktoken
+    tiktoken = None
+
+# Rough characters per token of English text, used without a tokenizer
+CHARS_PER_TOKEN = 4
+
+@lru_cache(maxsize=None)
+def _encoding(model: str) -> Optional["tiktoken.Encoding"]:
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # Encodings are downloaded on first use and may be unreachable
+        logger.warning("Tokenizer for %s unavailable, estimating token counts", model, exc_info=True)
+        return None
+
+def count_tokens(text: str, model: str) -> int:
+    """
+    Count the tokens of text for a model, estimating when no tokenizer is available
+    """
+    encoding = _encoding(model)
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text))
+
+def truncate_to_tokens(text: str, budget: int, model: str) -> str:
+    """
+    Cut text down to at most budget tokens
+    """
+    encoding = _encoding(model)
+    if encoding is None:
+        return text[:budget * CHARS_PER_TOKEN]
+    tokens = encoding.encode(text)
+    return text if len(tokens) <= budget else encoding.decode(tokens[:budget])
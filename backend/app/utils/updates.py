@@ -0,0 +1,62 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, status
+from motor.motor_asyncio import AsyncIOMotorClientSession
+from pydantic import BaseModel
+from pymongo import ReturnDocument
+
+from app.utils.mapper import ResponseMapper, ResponseT
+
+def _version_filter(expected_version: int) -> Dict[str, Any]:
+    # Documents written before versioning have no version field and count as version 0
+    if expected_version == 0:
+        return {"version": {"$in": [0, None]}}
+    return {"version": expected_version}
+
+async def apply_partial_update(
+    mapper: ResponseMapper[ResponseT],
+    document_id: Any,
+    update: BaseModel,
+    not_found_detail: str,
+    session: Optional[AsyncIOMotorClientSession] = None
+) -> ResponseT:
+    """
+    Set only the fields present in an update model with one find_one_and_update
+    and return the updated document.
+    
+    When the update carries a version, the write only applies if the stored
+    document still has that version; otherwise a 409 is raised. Every update
+    bumps the version and updated_at.
+    """
+    changes = update.model_dump(exclude_unset=True)
+    expected_version: Optional[int] = changes.pop("version", None)
+    
+    query: Dict[str, Any] = {"_id": document_id}
+    if expected_version is not None:
+        query.update(_version_filter(expected_version))
+    
+    collection = mapper.document_model.get_motor_collection()
+    document = await collection.find_one_and_update(
+        query,
+        {
+            "$set": {**changes, "updated_at": datetime.utcnow()},
+            "$inc": {"version": 1}
+        },
+        projection=mapper.projection,
+        return_document=ReturnDocument.AFTER,
+        session=session
+    )
+    
+    if document is None:
+        if expected_version is not None and await collection.count_documents({"_id": document_id}, limit=1, session=session):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="The record was modified by another request, reload it and retry"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=not_found_detail
+        )
+    
+    return mapper.response(document)
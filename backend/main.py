@@ -1,54 +1,56 @@
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from beanie import init_beanie
-from motor.motor_asyncio import AsyncIOMotorClient
 from contextlib import asynccontextmanager
-import os
 from dotenv import load_dotenv
 
-# Import models
-from app.models.user import User
-from app.models.institution import Institution
-from app.models.student import Student
-from app.models.score import Score
+from app.config.auth import shutdown_password_executor
+from app.config.database import init_db, close_db
+from app.services.ai_client import get_ai_client, close_ai_client
+from app.services.job_runner import job_runner
+from app.services.job_handlers import register_job_handlers
+from app.services.institution_cache import institution_cache
+from app.utils.responses import APIResponse
 
 # Import routers
 from app.routers.auth import router as auth_router
 from app.routers.users import router as users_router
 from app.routers.institutions import router as institutions_router
 from app.routers.students import router as students_router
+from app.routers.scores import router as scores_router
 from app.routers.ai import router as ai_router
+from app.routers.jobs import router as jobs_router
+from app.routers.health import router as health_router
 
 # Load environment variables from backend/.env
 load_dotenv(dotenv_path="backend/.env")
 
-# Database initialization
-async def init_db():
-    # MongoDB connection
-    client = AsyncIOMotorClient(os.getenv("MONGODB_URL", "mongodb://localhost:27017"))
-    await init_beanie(
-        database=client.techvantage,
-        document_models=[
-            User,
-            Institution,
-            Student,
-            Score
-        ]
-    )
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Initialize database connection
     await init_db()
+    # Open the shared AI client and its connection pool
+    get_ai_client()
+    # Follow institution changes to keep the institution cache current
+    institution_cache.start()
+    # Start working on queued background jobs
+    register_job_handlers()
+    job_runner.start()
     yield
-    # Clean up resources if needed
+    # Clean up resources
+    await job_runner.stop()
+    await institution_cache.stop()
+    await close_ai_client()
+    shutdown_password_executor()
+    close_db()
 
 # Create FastAPI app
 app = FastAPI(
     title="Techvantage API",
     description="API for Techvantage educational platform",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # orjson based responses, also encoding ObjectIds
+    default_response_class=APIResponse
 )
 
 # Configure CORS
@@ -58,6 +60,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Causal-Token", "ETag"],
 )
 
 # Include routers
@@ -65,7 +68,10 @@ app.include_router(auth_router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(users_router, prefix="/api/users", tags=["Users"])
 app.include_router(institutions_router, prefix="/api/institutions", tags=["Institutions"])
 app.include_router(students_router, prefix="/api/students", tags=["Students"])
+app.include_router(scores_router, prefix="/api/scores", tags=["Scores"])
 app.include_router(ai_router, prefix="/api/ai", tags=["AI Integration"])
+app.include_router(jobs_router, prefix="/api/jobs", tags=["Jobs"])
+app.include_router(health_router, prefix="/api/health", tags=["Health"])
 
 @app.get("/", tags=["Root"])
 async def root():
@@ -0,0 +1,27 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+@pytest.fixture
+def student_documents():
+    """
+    Build raw student documents as the students collection returns them
+    """
+    def build(count):
+        created = datetime(2024, 1, 1)
+        return [
+            {
+                "_id": ObjectId(),
+                "user_id": str(ObjectId()),
+                "institution_id": str(ObjectId()),
+                "grade": str(9 + i % 4),
+                "enrollment_year": 2020 + i % 5,
+                "graduation_year": None if i % 3 else 2028,
+                "created_at": created + timedelta(minutes=i),
+                "updated_at": created + timedelta(minutes=i),
+                "version": i % 3
+            }
+            for i in range(count)
+        ]
+    return build
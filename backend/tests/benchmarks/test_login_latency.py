@@ -0,0 +1,75 @@
+import asyncio
+import statistics
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import auth
+from app.controllers import auth_controller
+from app.controllers.auth_controller import authenticate_user
+from app.models.user import User
+
+pytestmark = [pytest.mark.anyio, pytest.mark.benchmark]
+
+CONCURRENT_LOGINS = 16
+TICK_SECONDS = 0.005
+
+def p99(samples):
+    # A ticker starved by inline bcrypt may only record one sample
+    if len(samples) < 2:
+        return max(samples)
+    return statistics.quantiles(samples, n=100, method="inclusive")[98]
+
+async def inline_verify(plain_password, hashed_password):
+    # bcrypt on the event loop, as before the worker pool
+    return auth.pwd_context.verify_and_update(plain_password, hashed_password)
+
+async def run_logins():
+    """
+    Run concurrent logins while a ticker measures how late the event loop wakes it,
+    returning the p99 login latency and the p99 event loop lag
+    """
+    done = asyncio.Event()
+    lags = []
+    
+    async def tick():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(TICK_SECONDS)
+            lags.append(time.perf_counter() - started - TICK_SECONDS)
+    
+    async def login():
+        started = time.perf_counter()
+        assert await authenticate_user("teacher", "secret")
+        return time.perf_counter() - started
+    
+    ticker = asyncio.create_task(tick())
+    latencies = await asyncio.gather(*(login() for _ in range(CONCURRENT_LOGINS)))
+    done.set()
+    await ticker
+    return p99(latencies), p99(lags)
+
+@pytest.fixture
+def stored_user(monkeypatch):
+    user = SimpleNamespace(username="teacher", hashed_password=auth.get_password_hash("secret"))
+    
+    async def find_one(query):
+        await asyncio.sleep(0.001)
+        return user
+    
+    monkeypatch.setattr(User, "find_one", find_one)
+    return user
+
+async def test_login_p99_with_worker_pool_against_inline_bcrypt(stored_user, monkeypatch, benchmark_report):
+    pooled_latency, pooled_lag = await run_logins()
+    monkeypatch.setattr(auth_controller, "verify_password_async", inline_verify)
+    inline_latency, inline_lag = await run_logins()
+    
+    benchmark_report(
+        f"{CONCURRENT_LOGINS} concurrent logins, bcrypt cost {auth.BCRYPT_ROUNDS}: "
+        f"p99 latency {pooled_latency * 1000:.0f} ms pooled, {inline_latency * 1000:.0f} ms inline; "
+        f"p99 event loop lag {pooled_lag * 1000:.1f} ms pooled, {inline_lag * 1000:.1f} ms inline"
+    )
+    # Login latency only improves with spare cores, but the loop stays responsive on any machine
+    assert pooled_lag < inline_lag
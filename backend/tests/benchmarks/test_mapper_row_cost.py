@@ -0,0 +1,30 @@
+import time
+
+import pytest
+
+from app.models.student import student_mapper
+
+pytestmark = pytest.mark.benchmark
+
+REPEATS = 5
+
+def best_seconds_per_row(build, documents):
+    best = float("inf")
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        build(documents)
+        best = min(best, time.perf_counter() - started)
+    return best / len(documents)
+
+@pytest.mark.parametrize("rows", [100, 1000, 10000])
+def test_payloads_cost_per_row(rows, student_documents, benchmark_report):
+    documents = student_documents(rows)
+    
+    mapped = best_seconds_per_row(student_mapper.payloads, documents)
+    validated = best_seconds_per_row(lambda docs: [student_mapper.response(doc) for doc in docs], documents)
+    
+    benchmark_report(
+        f"{rows} rows: payloads {mapped * 1e6:.2f} us/row, "
+        f"validated responses {validated * 1e6:.2f} us/row ({validated / mapped:.1f}x)"
+    )
+    assert mapped < validated
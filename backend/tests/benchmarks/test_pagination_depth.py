@@ -0,0 +1,53 @@
+import statistics
+import time
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.controllers.student_controller import get_students
+from app.models.student import Student
+from app.utils.pagination import encode_cursor
+
+pytestmark = [pytest.mark.anyio, pytest.mark.benchmark]
+
+PAGE_SIZE = 20
+DEEP_PAGE = 2000
+REPEATS = 20
+
+async def median_seconds(load):
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        page = await load()
+        timings.append(time.perf_counter() - started)
+        assert len(page) == PAGE_SIZE
+    return statistics.median(timings)
+
+async def test_first_and_deep_page_in_offset_and_cursor_modes(mongo_db, benchmark_report):
+    ids = sorted(ObjectId() for _ in range(PAGE_SIZE * DEEP_PAGE))
+    await Student.get_motor_collection().insert_many([
+        {
+            "_id": object_id,
+            "user_id": str(object_id),
+            "institution_id": "institution-1",
+            "grade": "10",
+            "enrollment_year": 2024,
+            "created_at": datetime(2024, 1, 1),
+            "updated_at": datetime(2024, 1, 1),
+            "version": 0
+        }
+        for object_id in ids
+    ])
+    deep_skip = PAGE_SIZE * (DEEP_PAGE - 1)
+    deep_cursor = encode_cursor("_id", None, ids[deep_skip - 1])
+    
+    timings = {
+        "offset page 1": await median_seconds(lambda: get_students(0, PAGE_SIZE)),
+        f"offset page {DEEP_PAGE}": await median_seconds(lambda: get_students(deep_skip, PAGE_SIZE)),
+        "cursor page 1": await median_seconds(lambda: get_students(limit=PAGE_SIZE)),
+        f"cursor page {DEEP_PAGE}": await median_seconds(lambda: get_students(limit=PAGE_SIZE, after=deep_cursor))
+    }
+    
+    benchmark_report(", ".join(f"{name} {seconds * 1000:.2f} ms" for name, seconds in timings.items()))
+    assert timings[f"cursor page {DEEP_PAGE}"] < timings[f"offset page {DEEP_PAGE}"]
@@ -0,0 +1,32 @@
+import random
+
+import pytest
+
+from app.services.ai_service import AI_MODEL, AI_PROMPT_TOKEN_BUDGET, compact_performance_prompt, summarize_scores
+from app.utils.tokens import count_tokens
+
+pytestmark = pytest.mark.benchmark
+
+def make_scores(rows, assessment_types):
+    rng = random.Random(rows)
+    return [
+        {"value": rng.randint(0, 100), "max_value": 100, "assessment_type": f"type {i % assessment_types}"}
+        for i in range(rows)
+    ]
+
+@pytest.mark.parametrize("rows, assessment_types", [
+    (10, 2),
+    (100, 10),
+    (1000, 50),
+    (10000, 500),
+    (100000, 5000)
+])
+def test_prompt_tokens_by_input_rows(rows, assessment_types, benchmark_report):
+    scores = make_scores(rows, assessment_types)
+    
+    prompt = compact_performance_prompt(scores, "Mathematics", summarize_scores(scores))
+    
+    tokens = count_tokens(prompt, AI_MODEL)
+    benchmark_report(f"{rows} rows, {assessment_types} assessment types: {tokens} prompt tokens")
+    assert tokens <= AI_PROMPT_TOKEN_BUDGET
+    assert "4. Suggested differentiation strategies" in prompt
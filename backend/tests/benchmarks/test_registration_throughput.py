@@ -0,0 +1,60 @@
+import asyncio
+import time
+
+import pytest
+
+from app.controllers import auth_controller
+from app.controllers.auth_controller import register_user
+from app.models.user import User, UserCreate
+
+pytestmark = [pytest.mark.anyio, pytest.mark.benchmark]
+
+REGISTRATIONS = 1000
+CONCURRENCY = 50
+
+async def check_then_register(user_data: UserCreate):
+    # Duplicate lookups the unique indexes replaced
+    if await User.find_one({"email": user_data.email}):
+        raise AssertionError("Email already registered")
+    if await User.find_one({"username": user_data.username}):
+        raise AssertionError("Username already taken")
+    return await register_user(user_data)
+
+async def registrations_per_second(register, prefix):
+    users = [
+        UserCreate(
+            email=f"{prefix}{i}@example.com",
+            username=f"{prefix}{i}",
+            password="secret",
+            first_name="Load",
+            last_name="Test",
+            role="teacher"
+        )
+        for i in range(REGISTRATIONS)
+    ]
+    slots = asyncio.Semaphore(CONCURRENCY)
+    
+    async def run(user_data):
+        async with slots:
+            await register(user_data)
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(run(user_data) for user_data in users))
+    return REGISTRATIONS / (time.perf_counter() - started)
+
+async def test_register_user_throughput(mongo_db, monkeypatch, benchmark_report):
+    async def cheap_hash(password):
+        return "not-a-bcrypt-hash"
+    
+    # bcrypt would dominate both runs; the difference is in the database round trips
+    monkeypatch.setattr(auth_controller, "get_password_hash_async", cheap_hash)
+    
+    checked = await registrations_per_second(check_then_register, "checked")
+    indexed = await registrations_per_second(register_user, "indexed")
+    
+    benchmark_report(
+        f"{REGISTRATIONS} registrations, {CONCURRENCY} at a time: "
+        f"{checked:.0f}/s checking first, {indexed:.0f}/s on unique indexes ({indexed / checked:.1f}x)"
+    )
+    assert await User.count() == 2 * REGISTRATIONS
+    assert indexed > checked
@@ -0,0 +1,45 @@
+import time
+from datetime import datetime
+
+import pytest
+
+from app.controllers.score_controller import create_score, create_scores_batch
+from app.models.score import Score, ScoreCreate
+
+pytestmark = [pytest.mark.anyio, pytest.mark.benchmark]
+
+ROWS = 2000
+
+def make_rows(count):
+    return [
+        {
+            "student_id": f"student-{i % 200}",
+            "subject": "Mathematics",
+            "score_value": i % 100,
+            "max_score": 100,
+            "score_type": "exam",
+            "date": datetime(2024, 1, 1).isoformat(),
+            "teacher_id": "teacher-1"
+        }
+        for i in range(count)
+    ]
+
+async def test_batch_insert_against_single_inserts(mongo_db, benchmark_report):
+    rows = make_rows(ROWS)
+    
+    started = time.perf_counter()
+    for row in rows:
+        await create_score(ScoreCreate(**row))
+    single = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    result = await create_scores_batch(rows)
+    batch = time.perf_counter() - started
+    
+    benchmark_report(
+        f"{ROWS} scores: one insert() each {ROWS / single:.0f} rows/s, "
+        f"create_scores_batch {ROWS / batch:.0f} rows/s ({single / batch:.1f}x)"
+    )
+    assert result.inserted_count == ROWS
+    assert await Score.count() == 2 * ROWS
+    assert batch < single
@@ -0,0 +1,66 @@
+import statistics
+import time
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from typing import List
+
+import httpx
+import orjson
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from app.models.student import StudentResponse, student_mapper
+from app.routers import students as students_router
+from main import app
+
+pytestmark = [pytest.mark.anyio, pytest.mark.benchmark]
+
+ROWS = 1000
+REQUESTS = 50
+
+async def median_seconds(target):
+    timings = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=target), base_url="http://test") as client:
+        for _ in range(REQUESTS):
+            started = time.perf_counter()
+            response = await client.get(f"/api/students/?limit={ROWS}")
+            timings.append(time.perf_counter() - started)
+            assert response.status_code == 200
+    return statistics.median(timings), orjson.loads(response.content)
+
+def revalidating_app(rows):
+    """
+    The students list route as it was: models validated against response_model,
+    then jsonable_encoded and dumped by the standard JSONResponse
+    """
+    before = FastAPI(default_response_class=JSONResponse)
+    
+    @before.get("/api/students/", response_model=List[StudentResponse])
+    async def read_students(limit: int = 100):
+        return [StudentResponse.model_validate(row) for row in rows[:limit]]
+    
+    return before
+
+async def test_students_list_serialization(student_documents, monkeypatch, benchmark_report):
+    rows = student_mapper.payloads(student_documents(ROWS))
+    
+    @asynccontextmanager
+    async def no_session(token=None):
+        yield SimpleNamespace(operation_time=None)
+    
+    async def get_students(skip, limit, *args):
+        return rows[:limit]
+    
+    monkeypatch.setattr(students_router, "causal_session", no_session)
+    monkeypatch.setattr(students_router, "get_students", get_students)
+    
+    before, before_body = await median_seconds(revalidating_app(rows))
+    after, after_body = await median_seconds(app)
+    
+    benchmark_report(
+        f"GET /api/students/?limit={ROWS}: {before * 1000:.1f} ms revalidated with JSONResponse, "
+        f"{after * 1000:.1f} ms with APIResponse ({before / after:.1f}x)"
+    )
+    assert after_body == before_body
+    assert after < before
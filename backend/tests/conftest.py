@@ -0,0 +1,112 @@
+import json
+import os
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List
+
+import httpx
+import pytest
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+from openai import AsyncOpenAI
+
+from app.config import database
+from app.services import ai_client as ai_client_module
+from app.services.ai_client import AIClient
+
+# Tests needing MongoDB run against this server, e.g. a local mongod replica set
+MONGODB_TEST_URL = os.getenv("MONGODB_TEST_URL")
+
+# Result lines reported by benchmarks, printed after the run
+_benchmark_results: List[str] = []
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+class FakeOpenAI:
+    """
+    Local stand-in for the OpenAI API, answering chat completions through an httpx transport
+    """
+    
+    def __init__(self):
+        self.requests: List[Dict[str, Any]] = []
+        # Replaces the default completion; receives the request body
+        self.handler: Callable[[Dict[str, Any]], Awaitable[httpx.Response]] = self.completion
+    
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        self.requests.append(body)
+        return await self.handler(body)
+    
+    @staticmethod
+    async def completion(body: Dict[str, Any], content: str = "generated") -> httpx.Response:
+        return httpx.Response(200, json={
+            "id": "chatcmpl-test",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }]
+        })
+    
+    @staticmethod
+    def chunk(body: Dict[str, Any], content: str) -> bytes:
+        payload = {
+            "id": "chatcmpl-test",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": None}]
+        }
+        return f"data: {json.dumps(payload)}\n\n".encode()
+
+@pytest.fixture
+async def fake_openai(monkeypatch):
+    """
+    Shared AI client talking to a FakeOpenAI upstream
+    """
+    upstream = FakeOpenAI()
+    client = AIClient(api_key="test")
+    client._http = httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+    client._openai = AsyncOpenAI(api_key="test", http_client=client._http, max_retries=0)
+    monkeypatch.setattr(ai_client_module, "_ai_client", client)
+    
+    yield upstream
+    
+    await client.close()
+
+@pytest.fixture
+async def mongo_db(monkeypatch):
+    """
+    Scratch database with every document model initialized, dropped afterwards
+    """
+    if not MONGODB_TEST_URL:
+        pytest.skip("MONGODB_TEST_URL is not set")
+    
+    client = AsyncIOMotorClient(MONGODB_TEST_URL)
+    db = client[f"test_{uuid.uuid4().hex[:12]}"]
+    await init_beanie(database=db, document_models=database.DOCUMENT_MODELS)
+    monkeypatch.setattr(database, "_client", client)
+    
+    yield db
+    
+    await client.drop_database(db.name)
+    client.close()
+
+@pytest.fixture
+def benchmark_report(request):
+    """
+    Record a result line of a benchmark for the terminal summary
+    """
+    def report(line: str):
+        _benchmark_results.append(f"{request.node.name}: {line}")
+    return report
+
+def pytest_terminal_summary(terminalreporter):
+    if _benchmark_results:
+        terminalreporter.section("benchmarks")
+        for line in _benchmark_results:
+            terminalreporter.write_line(line)
@@ -0,0 +1,99 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.services import ai_client as ai_client_module
+from app.services.ai_client import CircuitBreaker, get_ai_client
+
+MESSAGES = [{"role": "user", "content": "Hello"}]
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(HTTPException) as error:
+        breaker.before_call()
+    assert error.value.status_code == 503
+    assert "Retry-After" in error.value.headers
+
+def test_half_open_breaker_lets_one_trial_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+    breaker.record_failure()
+    assert breaker.state == "half_open"
+    
+    breaker.before_call()
+    with pytest.raises(HTTPException):
+        breaker.before_call()
+    
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+def test_failed_trial_opens_the_breaker_again():
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=0)
+    for _ in range(3):
+        breaker.record_failure()
+    breaker.before_call()
+    
+    breaker.reset_seconds = 60
+    breaker.record_failure()
+    
+    assert breaker.state == "open"
+    assert not breaker.trial_in_flight
+
+@pytest.mark.anyio
+async def test_cancelled_trial_releases_the_breaker(fake_openai):
+    async def hang(body):
+        await asyncio.Event().wait()
+    
+    fake_openai.handler = hang
+    client = get_ai_client()
+    client.breaker.record_failure()
+    client.breaker.opened_at = 0
+    
+    call = asyncio.create_task(client.complete(MESSAGES, model="test", max_tokens=5, temperature=0))
+    await asyncio.sleep(0.05)
+    assert client.breaker.trial_in_flight
+    call.cancel()
+    await asyncio.gather(call, return_exceptions=True)
+    
+    assert client.breaker.state == "half_open"
+    assert not client.breaker.trial_in_flight
+    
+    fake_openai.handler = fake_openai.completion
+    assert await client.complete(MESSAGES, model="test", max_tokens=5, temperature=0) == "generated"
+    assert client.breaker.state == "closed"
+
+@pytest.mark.anyio
+async def test_client_errors_do_not_count_against_the_breaker(fake_openai):
+    async def bad_request(body):
+        return httpx.Response(400, json={"error": {"message": "bad request"}})
+    
+    fake_openai.handler = bad_request
+    client = get_ai_client()
+    for _ in range(ai_client_module.AI_BREAKER_FAILURE_THRESHOLD):
+        with pytest.raises(Exception):
+            await client.complete(MESSAGES, model="test", max_tokens=5, temperature=0)
+    
+    assert client.breaker.state == "closed"
+    assert len(fake_openai.requests) == ai_client_module.AI_BREAKER_FAILURE_THRESHOLD
+
+@pytest.mark.anyio
+async def test_user_over_limit_is_rejected(fake_openai, monkeypatch):
+    monkeypatch.setattr(ai_client_module, "AI_MAX_CONCURRENCY_PER_USER", 1)
+    client = get_ai_client()
+    
+    async with client.user_slot("teacher"):
+        with pytest.raises(HTTPException) as error:
+            await client.complete(MESSAGES, model="test", max_tokens=5, temperature=0, user_id="teacher")
+        assert error.value.status_code == 429
+        
+        # Other users are unaffected
+        assert await client.complete(MESSAGES, model="test", max_tokens=5, temperature=0, user_id="other") == "generated"
+    
+    assert client.stats()["active_users"] == 0
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.services import ai_client as ai_client_module
+from app.services.ai_service import (
+    Generation,
+    ai_requests_in_flight,
+    compact_performance_prompt,
+    run_generation,
+    stream_generation,
+    summarize_scores
+)
+from tests.conftest import FakeOpenAI
+
+pytestmark = pytest.mark.anyio
+
+def _generation(topic: str = "fractions") -> Generation:
+    return Generation(
+        kind="test",
+        params={"topic": topic},
+        system_prompt="You are a test.",
+        prompt=f"Explain {topic}",
+        max_tokens=50,
+        result_field="text",
+        result_extra={"topic": topic}
+    )
+
+def _events(payload: str):
+    for block in payload.strip().split("\n\n"):
+        event, data = block.split("\n")
+        yield event.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+def _held_until(release: asyncio.Event):
+    # Upstream handler answering once release is set, so concurrent callers can pile up
+    async def handler(body):
+        await release.wait()
+        return await FakeOpenAI.completion(body, content="shared answer")
+    return handler
+
+async def test_identical_concurrent_calls_make_one_upstream_call(fake_openai):
+    release = asyncio.Event()
+    fake_openai.handler = _held_until(release)
+    
+    calls = [asyncio.create_task(run_generation(_generation(), user_id=f"teacher-{n}")) for n in range(20)]
+    await asyncio.sleep(0.05)
+    release.set()
+    results = await asyncio.gather(*calls)
+    
+    assert len(fake_openai.requests) == 1
+    assert results == [{"text": "shared answer", "topic": "fractions"}] * 20
+
+async def test_different_calls_are_not_coalesced(fake_openai):
+    await asyncio.gather(run_generation(_generation("fractions")), run_generation(_generation("decimals")))
+    
+    assert len(fake_openai.requests) == 2
+
+async def test_upstream_failure_reaches_every_waiter(fake_openai):
+    release = asyncio.Event()
+    
+    async def bad_request(body):
+        await release.wait()
+        return httpx.Response(400, json={"error": {"message": "bad request"}})
+    
+    fake_openai.handler = bad_request
+    calls = [asyncio.create_task(run_generation(_generation())) for _ in range(5)]
+    await asyncio.sleep(0.05)
+    release.set()
+    results = await asyncio.gather(*calls)
+    
+    assert len(fake_openai.requests) == 1
+    assert all("error" in result for result in results)
+    assert ai_requests_in_flight.stats()["in_flight"] == 0
+
+async def test_stream_sends_first_token_before_upstream_finishes(fake_openai):
+    release = asyncio.Event()
+    
+    async def chunks(body):
+        yield fake_openai.chunk(body, "First")
+        await release.wait()
+        yield fake_openai.chunk(body, " rest")
+        yield b"data: [DONE]\n\n"
+    
+    async def streamed(body):
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=chunks(body))
+    
+    fake_openai.handler = streamed
+    started = time.perf_counter()
+    events = stream_generation(_generation())
+    
+    first = await asyncio.wait_for(events.__anext__(), 1)
+    time_to_first_byte = time.perf_counter() - started
+    assert list(_events(first)) == [("delta", {"content": "First"})]
+    assert time_to_first_byte < 0.5
+    
+    release.set()
+    rest = [event async for event in events]
+    assert list(_events("".join(rest))) == [
+        ("delta", {"content": " rest"}),
+        ("done", {"text": "First rest", "topic": "fractions"})
+    ]
+
+async def test_coalesced_callers_keep_their_own_limit(fake_openai, monkeypatch):
+    monkeypatch.setattr(ai_client_module, "AI_MAX_CONCURRENCY_PER_USER", 1)
+    release = asyncio.Event()
+    fake_openai.handler = _held_until(release)
+    
+    first = asyncio.create_task(run_generation(_generation(), user_id="busy"))
+    joined = asyncio.create_task(run_generation(_generation(), user_id="other"))
+    await asyncio.sleep(0.05)
+    
+    # The busy user is at its own limit; the other user's join does not count against it
+    with pytest.raises(HTTPException) as error:
+        await run_generation(_generation(), user_id="busy")
+    assert error.value.status_code == 429
+    
+    release.set()
+    assert await first == await joined
+    assert len(fake_openai.requests) == 1
+
+def test_prompt_over_budget_keeps_largest_groups_and_instructions():
+    scores = [
+        {"value": i % 100, "max_value": 100, "assessment_type": f"type {i % 300}" if i % 2 else "exam"}
+        for i in range(6000)
+    ]
+    
+    prompt = compact_performance_prompt(scores, "Mathematics", summarize_scores(scores))
+    
+    assert "exam: 3000 scores" in prompt
+    assert "other assessment types" in prompt
+    assert "Please provide:" in prompt
+    assert "4. Suggested differentiation strategies for struggling and advanced students" in prompt
@@ -0,0 +1,51 @@
+from app.utils.cache import LRUCache
+
+def test_get_returns_stored_value_and_counts_hits():
+    cache = LRUCache(max_size=2)
+    cache.set("a", 1)
+    
+    assert cache.get("a") == 1
+    assert cache.get("missing") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hit_ratio"] == 0.5
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    # Reading a makes b the least recently used entry
+    cache.get("a")
+    cache.set("c", 3)
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+def test_expired_entries_are_misses():
+    cache = LRUCache(max_size=2, ttl=60)
+    cache.set("expired", 1, ttl=0)
+    cache.set("fresh", 2)
+    
+    assert cache.get("expired") is None
+    assert cache.get("fresh") == 2
+    assert len(cache) == 1
+
+def test_zero_size_cache_stores_nothing():
+    cache = LRUCache(max_size=0)
+    cache.set("a", 1)
+    
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+def test_delete_and_clear():
+    cache = LRUCache()
+    cache.set("a", 1)
+    cache.set("b", 2)
+    
+    cache.delete("a")
+    assert cache.get("a") is None
+    
+    cache.clear()
+    assert len(cache) == 0
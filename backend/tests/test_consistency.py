@@ -0,0 +1,41 @@
+from datetime import datetime
+
+import pytest
+
+from app.models.student import Student
+from app.utils.consistency import causal_session, causal_token, routed_collection
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def replica_set(mongo_db):
+    hello = await mongo_db.client.admin.command("hello")
+    if "setName" not in hello:
+        pytest.skip("MONGODB_TEST_URL is not a replica set")
+    return mongo_db
+
+async def test_list_reads_see_the_callers_own_write(replica_set):
+    async with causal_session() as session:
+        student = Student(
+            user_id="64b7f0c2a1b2c3d4e5f60718",
+            institution_id="64b7f0c2a1b2c3d4e5f60719",
+            grade="10",
+            enrollment_year=datetime.utcnow().year
+        )
+        await student.insert(session=session)
+        token = causal_token(session)
+    
+    assert token is not None
+    
+    # A later request carrying the token reads from a secondary that has caught up
+    async with causal_session(token) as session:
+        found = await routed_collection(Student, "lists").find_one({"_id": student.id}, session=session)
+    
+    assert found is not None
+    assert found["user_id"] == student.user_id
+
+async def test_routed_reads_prefer_secondaries(replica_set):
+    collection = routed_collection(Student, "analytics")
+    
+    assert collection.read_preference.mongos_mode == "secondaryPreferred"
+    assert collection.read_concern.level == "majority"
@@ -0,0 +1,46 @@
+import pytest
+
+from app.controllers import institution_controller
+from app.controllers.institution_controller import get_institutions_etag
+from app.models.institution import Institution
+from app.services.institution_cache import institution_cache
+
+pytestmark = pytest.mark.anyio
+
+class FakeInstitutions:
+    """
+    Institutions collection answering the listing ETag queries with fixed values
+    """
+    
+    def __init__(self, count):
+        self.count = count
+    
+    async def count_documents(self, query, session=None):
+        return self.count
+    
+    async def find_one(self, query, projection=None, sort=None, session=None):
+        return None
+
+@pytest.fixture
+def collections(monkeypatch):
+    primary, secondary = FakeInstitutions(2), FakeInstitutions(1)
+    monkeypatch.setattr(Institution, "get_motor_collection", classmethod(lambda cls: primary))
+    monkeypatch.setattr(institution_controller, "routed_collection", lambda model, route: secondary)
+    monkeypatch.setattr(institution_cache, "watching", True)
+    institution_cache.invalidate()
+    yield primary, secondary
+    institution_cache.invalidate()
+
+async def test_cached_entries_are_loaded_from_the_primary(collections):
+    primary, secondary = collections
+    
+    cached = await get_institutions_etag()
+    
+    assert cached == institution_controller.make_etag(primary.count, None)
+
+async def test_uncached_reads_use_the_list_read_preference(collections):
+    primary, secondary = collections
+    
+    etag = await get_institutions_etag(use_cache=False)
+    
+    assert etag == institution_controller.make_etag(secondary.count, None)
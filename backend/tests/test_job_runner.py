@@ -0,0 +1,77 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+
+from app.models.job import Job
+from app.services import job_runner as job_runner_module
+from app.services.job_runner import JobRunner, _Registration
+
+pytestmark = pytest.mark.anyio
+
+class FakeJobs:
+    """
+    Jobs collection whose lease renewals follow a script: a matched count or an exception per call
+    """
+    
+    def __init__(self, renewals):
+        self.renewals = list(renewals)
+        self.finished = []
+    
+    async def update_one(self, query, update):
+        if "lease_expires_at" in update["$set"] and "status" not in update["$set"]:
+            outcome = self.renewals.pop(0) if self.renewals else 1
+            if isinstance(outcome, Exception):
+                raise outcome
+            return SimpleNamespace(matched_count=outcome)
+        self.finished.append(update["$set"]["status"])
+        return SimpleNamespace(matched_count=1)
+
+@pytest.fixture
+def jobs(monkeypatch):
+    def install(renewals):
+        collection = FakeJobs(renewals)
+        monkeypatch.setattr(Job, "get_motor_collection", classmethod(lambda cls: collection))
+        return collection
+    # Renew the lease every 50 ms
+    monkeypatch.setattr(job_runner_module, "JOB_LEASE_SECONDS", 0.15)
+    return install
+
+def _job() -> Job:
+    return Job.model_construct(id=ObjectId(), type="test", attempts=1, max_attempts=3)
+
+async def test_lost_lease_cancels_the_handler(jobs):
+    collection = jobs([1, 0])
+    cancelled = asyncio.Event()
+    
+    async def handler(job):
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+    
+    registration = _Registration(handler, 1)
+    registration.running = 1
+    execution = asyncio.create_task(JobRunner()._execute(_job(), registration))
+    
+    await asyncio.wait_for(cancelled.wait(), 1)
+    await asyncio.gather(execution, return_exceptions=True)
+    assert execution.cancelled()
+    assert registration.running == 0
+    # The other worker owns the job now, so this one records no outcome
+    assert collection.finished == []
+
+async def test_failed_renewal_is_retried(jobs):
+    collection = jobs([ConnectionError("network stall"), 1])
+    
+    async def handler(job):
+        await asyncio.sleep(0.2)
+        return {"done": True}
+    
+    registration = _Registration(handler, 1)
+    registration.running = 1
+    await JobRunner()._execute(_job(), registration)
+    
+    assert collection.finished == ["succeeded"]
@@ -0,0 +1,39 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.utils.pagination import decode_cursor, encode_cursor, resolve_sort_key
+
+@pytest.mark.parametrize("sort_by, value", [
+    ("_id", None),
+    ("name", "Springfield High"),
+    ("enrollment_year", 2024),
+    ("created_at", datetime(2024, 5, 1, 12, 30, 15, 250000))
+])
+def test_cursor_round_trip(sort_by, value):
+    object_id = ObjectId()
+    
+    cursor = encode_cursor(sort_by, value, str(object_id))
+    
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (sort_by, value, object_id)
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    encode_cursor("_id", None, "not-an-object-id"),
+    "eyJzIjoiX2lkIn0"
+])
+def test_invalid_cursor_is_a_bad_request(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+    
+    assert error.value.status_code == 400
+
+def test_cursor_carries_its_sort_key():
+    cursor = encode_cursor("created_at", datetime(2024, 1, 1), str(ObjectId()))
+    
+    assert resolve_sort_key(None, cursor) == "created_at"
+    assert resolve_sort_key("name", None) == "name"
+    assert resolve_sort_key(None, None) == "_id"
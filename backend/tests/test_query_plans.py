@@ -0,0 +1,39 @@
+from typing import Any, Dict, Iterator
+
+import pytest
+
+from app.models.institution import Institution
+from app.models.score import Score
+from app.models.student import Student
+from app.models.user import User
+
+pytestmark = pytest.mark.anyio
+
+def _stages(plan: Dict[str, Any]) -> Iterator[str]:
+    # Slot based plans on MongoDB 7 wrap the classic plan tree in queryPlan
+    if "stage" in plan:
+        yield plan["stage"]
+    for child in plan.get("inputStages", []) + [plan[key] for key in ("inputStage", "queryPlan") if key in plan]:
+        yield from _stages(child)
+
+HOT_QUERIES = [
+    (User, {"email": "teacher@example.com"}, None),
+    (User, {"username": "teacher"}, None),
+    (Student, {"user_id": "64b7f0c2a1b2c3d4e5f60718"}, None),
+    (Student, {"institution_id": "64b7f0c2a1b2c3d4e5f60719"}, [("_id", 1)]),
+    (Student, {"institution_id": "64b7f0c2a1b2c3d4e5f60719", "grade": "10"}, None),
+    (Score, {"student_id": "64b7f0c2a1b2c3d4e5f60718", "subject": "math"}, [("date", -1)]),
+    (Institution, {"name": "Springfield High"}, None)
+]
+
+@pytest.mark.parametrize("model, query, sort", HOT_QUERIES)
+async def test_hot_queries_use_an_index(mongo_db, model, query, sort):
+    cursor = model.get_motor_collection().find(query)
+    if sort:
+        cursor = cursor.sort(sort)
+    
+    explain = await cursor.explain()
+    
+    stages = set(_stages(explain["queryPlanner"]["winningPlan"]))
+    assert "COLLSCAN" not in stages
+    assert "IXSCAN" in stages
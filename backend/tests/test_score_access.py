@@ -0,0 +1,32 @@
+import httpx
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.config import database
+from app.config.auth import TokenData, get_current_user
+from main import app
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def student_client(monkeypatch):
+    """
+    API client signed in as a student; no server is needed as reads are refused first
+    """
+    monkeypatch.setattr(database, "_client", AsyncIOMotorClient("mongodb://localhost:1", connect=False))
+    app.dependency_overrides[get_current_user] = lambda: TokenData(username="s", user_id="u1", role="student")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+    database._client.close()
+
+@pytest.mark.parametrize("path", [
+    "/api/scores/",
+    "/api/scores/65a000000000000000000000",
+    "/api/scores/summary/65a000000000000000000000",
+    "/api/scores/stats"
+])
+async def test_students_cannot_read_scores(student_client, path):
+    response = await student_client.get(path)
+    
+    assert response.status_code == 403
@@ -0,0 +1,97 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from pymongo.errors import OperationFailure
+
+from app.controllers import score_controller
+from app.controllers.score_controller import get_score_stats
+from app.models.score import ScoreStatsGroupBy
+from app.models.student import Student
+
+pytestmark = pytest.mark.anyio
+
+class FakeScores:
+    """
+    Scores collection answering aggregations with fixed rows, or an error
+    """
+    
+    def __init__(self, rows=(), error=None):
+        self.rows = rows
+        self.error = error
+        self.pipelines = []
+    
+    def aggregate(self, pipeline, session=None):
+        self.pipelines.append(pipeline)
+        return self._results()
+    
+    async def _results(self):
+        if self.error:
+            raise self.error
+        for row in self.rows:
+            yield row
+
+@pytest.fixture
+def scores(monkeypatch):
+    def install(**kwargs):
+        collection = FakeScores(**kwargs)
+        monkeypatch.setattr(score_controller, "routed_collection", lambda model, route: collection)
+        return collection
+    return install
+
+async def test_groups_are_built_from_one_row_each(scores):
+    collection = scores(rows=[{
+        "_id": "math",
+        "count": 4,
+        "mean": 0.6,
+        "std_dev": 0.1,
+        "min": 0.4,
+        "max": 0.8,
+        "percentiles": [0.45, 0.5, 0.6, 0.7, 0.75],
+        "bin_0": 1,
+        "bin_1": 3
+    }])
+    
+    stats = await get_score_stats(ScoreStatsGroupBy.SUBJECT, bins=2)
+    
+    [group] = stats.groups
+    assert group.key == "math"
+    assert group.median == 0.6
+    assert group.histogram == [1, 3]
+    assert not any("$facet" in stage for stage in collection.pipelines[0])
+
+async def test_bin_is_computed_once_per_score(scores):
+    collection = scores()
+    
+    await get_score_stats(ScoreStatsGroupBy.SUBJECT, bins=100)
+    
+    pipeline = collection.pipelines[0]
+    assert sum("bin" in stage.get("$set", {}) for stage in pipeline) == 1
+    group = next(stage["$group"] for stage in pipeline if "$group" in stage)
+    assert group["bin_99"] == {"$sum": {"$cond": [{"$eq": ["$bin", 99]}, 1, 0]}}
+
+async def test_servers_without_percentile_get_a_503(scores):
+    scores(error=OperationFailure("unknown group operator '$percentile'", code=15952))
+    
+    with pytest.raises(HTTPException) as error:
+        await get_score_stats()
+    
+    assert error.value.status_code == 503
+    assert "7.0" in error.value.detail
+
+async def test_other_failures_are_not_masked(scores):
+    scores(error=OperationFailure("interrupted", code=11601))
+    
+    with pytest.raises(OperationFailure):
+        await get_score_stats()
+
+async def test_institution_filter_joins_students_instead_of_listing_them(scores, monkeypatch):
+    collection = scores()
+    monkeypatch.setattr(Student, "get_settings", classmethod(lambda cls: SimpleNamespace(name="students")))
+    
+    await get_score_stats(institution_id="i1")
+    
+    pipeline = collection.pipelines[0]
+    assert any("$lookup" in stage for stage in pipeline)
+    assert {"$match": {"institution_id": "i1"}} in pipeline
+    assert "$in" not in repr(pipeline)
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from app.utils.singleflight import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    release = asyncio.Event()
+    runs = 0
+    
+    async def work():
+        nonlocal runs
+        runs += 1
+        await release.wait()
+        return "result"
+    
+    waiters = [asyncio.create_task(flight.do("key", work)) for _ in range(10)]
+    await asyncio.sleep(0)
+    release.set()
+    
+    assert await asyncio.gather(*waiters) == ["result"] * 10
+    assert runs == 1
+    assert flight.stats() == {"in_flight": 0, "executions": 1, "coalesced": 9}
+
+async def test_different_keys_run_separately():
+    flight = SingleFlight()
+    
+    async def work(value):
+        await asyncio.sleep(0)
+        return value
+    
+    results = await asyncio.gather(flight.do("a", lambda: work(1)), flight.do("b", lambda: work(2)))
+    
+    assert results == [1, 2]
+    assert flight.executions == 2
+
+async def test_every_waiter_receives_the_exception():
+    flight = SingleFlight()
+    
+    async def work():
+        await asyncio.sleep(0)
+        raise ValueError("upstream failed")
+    
+    results = await asyncio.gather(*(flight.do("key", work) for _ in range(3)), return_exceptions=True)
+    
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight.executions == 1
+
+async def test_cancelling_one_waiter_leaves_the_others():
+    flight = SingleFlight()
+    release = asyncio.Event()
+    
+    async def work():
+        await release.wait()
+        return "result"
+    
+    first = asyncio.create_task(flight.do("key", work))
+    second = asyncio.create_task(flight.do("key", work))
+    await asyncio.sleep(0)
+    
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    
+    assert await second == "result"
+    assert first.cancelled()
+
+async def test_work_is_cancelled_once_nobody_waits():
+    flight = SingleFlight()
+    cancelled = asyncio.Event()
+    
+    async def work():
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+    
+    waiter = asyncio.create_task(flight.do("key", work))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    
+    await asyncio.wait_for(cancelled.wait(), 1)
+    assert flight.stats()["in_flight"] == 0
+
+async def test_finished_key_runs_again():
+    flight = SingleFlight()
+    runs = 0
+    
+    async def work():
+        nonlocal runs
+        runs += 1
+        return runs
+    
+    assert await flight.do("key", work) == 1
+    assert await flight.do("key", work) == 2